@@ -0,0 +1,71 @@
+import json
+import asyncio
+from time import time
+from tornado.web import Application, RequestHandler
+from tornado.httpserver import HTTPServer
+
+
+class FakeBotAPI:
+    __slots__ = ('_host', '_port', '_latency', '_server', '_message_ids', 'markups', 'calls')
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8081, latency: float = 0.0) -> None:
+        self._host = host
+        self._port = port
+        self._latency = latency
+        self._server = None
+        self._message_ids = {}
+        self.markups = {}
+        self.calls = {}
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self._host}:{self._port}/bot'
+
+    def last_message_id(self, chat_id: int) -> int:
+        return self._message_ids.get(chat_id, 0)
+
+    def reset_stats(self) -> None:
+        self.calls = {}
+
+    async def handle(self, method: str, params: dict[str, str]) -> object:
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self._latency:
+            await asyncio.sleep(self._latency)
+
+        if method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'bench', 'username': 'bench_bot'}
+        chat_id = int(params.get('chat_id', 0))
+        if method in ('sendMessage', 'sendDocument', 'editMessageText'):
+            if method == 'editMessageText':
+                message_id = int(params['message_id'])
+            else:
+                message_id = self._message_ids[chat_id] = self._message_ids.get(chat_id, 0) + 1
+            if 'reply_markup' in params:
+                self.markups[chat_id] = json.loads(params['reply_markup'])
+            return {
+                'message_id': message_id,
+                'date': int(time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'text': params.get('text', '')
+            }
+        return True
+
+    async def start(self) -> None:
+        api = self
+
+        class Handler(RequestHandler):
+            async def post(self, token: str, method: str) -> None:
+                params = {k: v[0].decode() for k, v in self.request.body_arguments.items()}
+                if not params and self.request.body:
+                    params = {k: v if isinstance(v, str) else json.dumps(v)
+                              for k, v in json.loads(self.request.body).items()}
+                self.write({'ok': True, 'result': await api.handle(method, params)})
+
+        self._server = HTTPServer(Application([(r'/bot([^/]+)/(\w+)', Handler)]))
+        self._server.listen(self._port, self._host)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.stop()
+            await self._server.close_all_connections()
+            self._server = None
@@ -0,0 +1,226 @@
+import json
+import random
+import asyncio
+import argparse
+import threading
+from os import path
+from time import perf_counter
+from statistics import quantiles
+from uuid import uuid4
+from dotenv import dotenv_values
+from telegram import Update
+from core.bot import QuizBot
+from core.base_api import API
+from core.db import DBTool
+from core.logger import Logger
+from core.quiz_builder import QuizBuilder
+from core.rate_limiter import OutgoingRateLimiter
+from core.webhook import UpdateFactory
+from benchmarks.fake_bot_api import FakeBotAPI
+
+
+USER_ID_BASE = 2_000_000_000
+
+
+class QueryCounter:
+    __slots__ = ('_lock', 'count')
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def wrap(self, func):
+        counter = self
+
+        def wrapper(*args, **kwargs):
+            with counter._lock:
+                counter.count += 1
+            return func(*args, **kwargs)
+        return wrapper
+
+
+class LoadTest:
+    __slots__ = ('_bot', '_api', '_db', '_fake_api', '_updates', '_queries',
+                 '_quiz_name', '_questions', '_next_user_id', '_latencies')
+
+    def __init__(self,
+                 bot: QuizBot,
+                 api: API,
+                 db: DBTool,
+                 fake_api: FakeBotAPI,
+                 queries: QueryCounter,
+                 questions: int) -> None:
+        self._bot = bot
+        self._api = api
+        self._db = db
+        self._fake_api = fake_api
+        self._updates = UpdateFactory()
+        self._queries = queries
+        self._quiz_name = f'bench-{uuid4().hex[:8]}'
+        self._questions = questions
+        self._next_user_id = USER_ID_BASE
+        self._latencies = {}
+
+    async def setup(self) -> None:
+        await self._api.add_quiz(QuizBuilder.create_quiz_from_message(
+            f'{self._quiz_name}\n{self._questions}\n' + ' '.join(['1'] * self._questions)
+        ))
+        quiz_id = next(x[0] for x in await self._api.get_all_quizzes() if x[1] == self._quiz_name)
+        await self._api.toggle_quiz_activity(quiz_id)
+
+    async def cleanup(self) -> None:
+        quiz_id = next((x[0] for x in await self._api.get_all_quizzes() if x[1] == self._quiz_name), None)
+        if quiz_id is not None:
+            await self._api.delete_quiz(quiz_id)
+        await self._db._execute('bench_cleanup', 'DELETE FROM quiz_sessions WHERE user_id >= %s;', USER_ID_BASE)
+        await self._db._execute('bench_cleanup', 'DELETE FROM users WHERE user_id >= %s;', USER_ID_BASE)
+
+    async def _send(self, step: str, update: dict) -> None:
+        app = self._bot.application
+        update = Update.de_json(update, app.bot)
+        started = perf_counter()
+        await app.update_processor.process_update(update, app.process_update(update))
+        self._latencies.setdefault(step, []).append(perf_counter() - started)
+
+    def _button(self, user_id: int, text: str | None = None, row: int = 0) -> str:
+        keyboard = self._fake_api.markups[user_id]['inline_keyboard']
+        if text is None:
+            return keyboard[row][0]['callback_data']
+        return next(b['callback_data'] for r in keyboard for b in r if b['text'] == text)
+
+    async def _click(self, step: str, user_id: int, data: str) -> None:
+        await self._send(step, self._updates.make_callback_update(
+            user_id, self._fake_api.last_message_id(user_id), data
+        ))
+
+    async def _simulate_user(self, user_id: int) -> None:
+        await self._send('start', self._updates.make_message_update(user_id, '/start'))
+        await self._send('real_name', self._updates.make_message_update(user_id, 'Тест Тестов Тестович'))
+        await self._click('choose_quiz', user_id, self._button(user_id, '🧩 Пройти квиз'))
+        await self._click('init_quiz', user_id, self._button(user_id, self._quiz_name))
+        for i in range(self._questions):
+            step = 'submit' if i == self._questions - 1 else 'answer'
+            await self._click(step, user_id, self._button(user_id, row=random.randrange(4)))
+
+    async def run_scenario(self, users: int) -> dict:
+        user_ids = range(self._next_user_id, self._next_user_id + users)
+        self._next_user_id += users
+        self._latencies = {}
+        self._fake_api.reset_stats()
+        queries_before = self._queries.count
+
+        started = perf_counter()
+        await asyncio.gather(*(self._simulate_user(x) for x in user_ids))
+        duration = perf_counter() - started
+
+        latencies = [x for values in self._latencies.values() for x in values]
+        queries = self._queries.count - queries_before
+        return {
+            'users': users,
+            'concurrency': self._bot.application.update_processor.max_concurrent_updates,
+            'updates': len(latencies),
+            'duration_s': round(duration, 3),
+            'throughput_updates_per_s': round(len(latencies) / duration, 1),
+            'latency_ms': self._summary(latencies),
+            'latency_ms_by_step': {k: self._summary(v) for k, v in self._latencies.items()},
+            'db_queries': queries,
+            'db_queries_per_update': round(queries / len(latencies), 2),
+            'bot_api_calls': dict(sorted(self._fake_api.calls.items()))
+        }
+
+    @staticmethod
+    def _summary(values: list[float]) -> dict[str, float]:
+        values = sorted(values)
+        if len(values) > 1:
+            cuts = quantiles(values, n=100, method='inclusive')
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = values[0]
+        return {
+            'p50': round(p50 * 1000, 2),
+            'p95': round(p95 * 1000, 2),
+            'p99': round(p99 * 1000, 2),
+            'max': round(values[-1] * 1000, 2)
+        }
+
+
+async def main(config: dict, args: argparse.Namespace) -> dict:
+    db = DBTool(
+        config['DB_USERNAME'],
+        config['DB_PASSWORD'],
+        config['DB_HOST'],
+        config['DB_PORT'],
+        config['DB_NAME'],
+        int(config.get('DB_POOL_MIN_SIZE', 1)),
+        int(config.get('DB_POOL_MAX_SIZE', 10)),
+        float(config.get('DB_POOL_TIMEOUT', 5))
+    )
+    queries = QueryCounter()
+    db_class = type(db)
+    db_class._statement = queries.wrap(db_class._statement)
+    db_class._run_stream = queries.wrap(db_class._run_stream)
+
+    fake_api = FakeBotAPI(port=args.api_port, latency=args.api_latency / 1000)
+    await fake_api.start()
+    rate_limiter = None if args.rate_limit else OutgoingRateLimiter(1e9, 1e9, 1e9, 1e9)
+    api = API(db)
+    bot = QuizBot('1:bench', api, uuid4().hex, args.concurrency, rate_limiter, fake_api.base_url)
+    test = LoadTest(bot, api, db, fake_api, queries, args.questions)
+
+    await bot.application.initialize()
+    await api.start()
+    try:
+        await test.setup()
+        scenarios = {}
+        for users in args.users:
+            scenarios[f'users_{users}'] = await test.run_scenario(users)
+    finally:
+        try:
+            await test.cleanup()
+        except Exception as err:
+            print(f'Не удалось удалить тестовые данные: {err}')
+        await api.close()
+        await bot.application.shutdown()
+        await fake_api.stop()
+        db.close_connection()
+    return {
+        'questions': args.questions,
+        'api_latency_ms': args.api_latency,
+        'rate_limit': args.rate_limit,
+        'scenarios': scenarios
+    }
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        description='Нагрузочное тестирование бота на фейковом Bot API и локальной БД.'
+    )
+    arg_parser.add_argument('--users', type=int, nargs='+', default=[10, 50, 100],
+                            help='Число одновременных пользователей в каждом сценарии')
+    arg_parser.add_argument('--concurrency', type=int, default=32,
+                            help='Число обновлений, обрабатываемых одновременно')
+    arg_parser.add_argument('--questions', type=int, default=10,
+                            help='Число вопросов в тестовом квизе')
+    arg_parser.add_argument('--api-port', type=int, default=8081,
+                            help='Порт фейкового Bot API')
+    arg_parser.add_argument('--api-latency', type=float, default=0.0,
+                            help='Искусственная задержка ответа Bot API в миллисекундах')
+    arg_parser.add_argument('--rate-limit', action='store_true',
+                            help='Включить ограничение частоты исходящих запросов')
+    arg_parser.add_argument('--env', default='.env',
+                            help='Файл с параметрами подключения к БД')
+    arg_parser.add_argument('--output', default='bench_results.json',
+                            help='Файл, в который записываются результаты')
+    args = arg_parser.parse_args()
+
+    if not path.exists(args.env):
+        print('Нет файла с переменными окружения. Запустите скрипт gen_dot_env.py для его генерации.')
+    else:
+        Logger.check_logs_dir_existence()
+        report = asyncio.run(main(dotenv_values(args.env), args))
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        for name, result in report['scenarios'].items():
+            print(f'{name}: {result["throughput_updates_per_s"]} upd/s, '
+                  f'p50 {result["latency_ms"]["p50"]} ms, p99 {result["latency_ms"]["p99"]} ms, '
+                  f'{result["db_queries_per_update"]} queries/update')
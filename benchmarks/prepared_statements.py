@@ -0,0 +1,122 @@
+import json
+import random
+import asyncio
+import argparse
+from os import path
+from time import perf_counter
+from statistics import quantiles
+from uuid import uuid4
+from dotenv import dotenv_values
+from core.db import DBTool
+from core.logger import Logger
+from core.statements import StatementRegistry
+
+
+USER_ID_BASE = 2_000_000_000
+
+
+class PreparedStatementsBenchmark:
+    __slots__ = ('_db', '_iterations', '_quiz_ids')
+
+    def __init__(self, db: DBTool, iterations: int) -> None:
+        self._db = db
+        self._iterations = iterations
+        self._quiz_ids = []
+
+    async def setup(self) -> None:
+        self._quiz_ids = [x[0] for x in await self._db.get_all_quizzes()] or [str(uuid4())]
+
+    def _queries(self) -> dict:
+        db = self._db
+        return {
+            'get_user_profile':
+                lambda: db.get_user_profile(USER_ID_BASE + random.randrange(1000)),
+            'get_quiz_access':
+                lambda: db.get_quiz_access(USER_ID_BASE + random.randrange(1000),
+                                           random.choice(self._quiz_ids)),
+            'fetch_quiz':
+                lambda: db.fetch_quiz(random.choice(self._quiz_ids)),
+            'get_quizzes_signature':
+                lambda: db.get_quizzes_signature(),
+            'get_quiz_results_signature':
+                lambda: db.get_quiz_results_signature(random.choice(self._quiz_ids)),
+            'load_quiz_session':
+                lambda: db.load_quiz_session(USER_ID_BASE + random.randrange(1000), 10800.0)
+        }
+
+    async def run(self, prepared: bool) -> dict:
+        self._db._statements = StatementRegistry() if prepared else None
+        results = {}
+        for name, query in self._queries().items():
+            await query()
+            durations = []
+            for _ in range(self._iterations):
+                started = perf_counter()
+                await query()
+                durations.append(perf_counter() - started)
+            results[name] = self._summary(durations)
+        return results
+
+    @staticmethod
+    def _summary(durations: list[float]) -> dict:
+        values = sorted(durations)
+        p50, p95 = (quantiles(values, n=100)[i] for i in (49, 94))
+        return {
+            'mean': round(sum(values) / len(values) * 1000, 3),
+            'p50': round(p50 * 1000, 3),
+            'p95': round(p95 * 1000, 3)
+        }
+
+
+async def main(config: dict, args: argparse.Namespace) -> dict:
+    db = DBTool(
+        config['DB_USERNAME'],
+        config['DB_PASSWORD'],
+        config['DB_HOST'],
+        config['DB_PORT'],
+        config['DB_NAME'],
+        1,
+        1,
+        float(config.get('DB_POOL_TIMEOUT', 5)),
+        slow_query_threshold=None
+    )
+    benchmark = PreparedStatementsBenchmark(db, args.iterations)
+    try:
+        await benchmark.setup()
+        report = {'iterations': args.iterations}
+        for _ in range(args.rounds):
+            for mode, prepared in (('plain', False), ('prepared', True)):
+                for name, result in (await benchmark.run(prepared)).items():
+                    best = report.setdefault(mode, {}).get(name)
+                    if best is None or result['mean'] < best['mean']:
+                        report[mode][name] = result
+    finally:
+        db.close_connection()
+    return report
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        description='Сравнение времени выполнения запросов DBTool с подготовленными выражениями и без них.'
+    )
+    arg_parser.add_argument('--iterations', type=int, default=2000,
+                            help='Число выполнений каждого запроса в одном прогоне')
+    arg_parser.add_argument('--rounds', type=int, default=3,
+                            help='Число прогонов; в отчет попадает лучший')
+    arg_parser.add_argument('--env', default='.env',
+                            help='Файл с параметрами подключения к БД')
+    arg_parser.add_argument('--output', default='bench_prepared.json',
+                            help='Файл, в который записываются результаты')
+    args = arg_parser.parse_args()
+
+    if not path.exists(args.env):
+        print('Нет файла с переменными окружения. Запустите скрипт gen_dot_env.py для его генерации.')
+    else:
+        Logger.check_logs_dir_existence()
+        report = asyncio.run(main(dotenv_values(args.env), args))
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        for name, plain in report['plain'].items():
+            prepared = report['prepared'][name]
+            print(f'{name}: {plain["mean"]} ms -> {prepared["mean"]} ms '
+                  f'(p95 {plain["p95"]} ms -> {prepared["p95"]} ms)')
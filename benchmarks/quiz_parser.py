@@ -0,0 +1,82 @@
+import json
+import random
+import argparse
+from time import perf_counter
+from core.quiz_builder import QuizBuilder, QuizCreationError
+
+
+class QuizParserBenchmark:
+    __slots__ = ('_repeat', '_seed')
+
+    def __init__(self, repeat: int, seed: int) -> None:
+        self._repeat = repeat
+        self._seed = seed
+
+    def message(self, questions: int, broken: bool = False) -> str:
+        rnd = random.Random(self._seed + questions)
+        options_counts = [rnd.randint(2, 8) for _ in range(questions)]
+        right_answers = [str(rnd.randint(1, x)) for x in options_counts]
+        wordings = [f'Вопрос {i+1}: ' + 'формулировка ' * rnd.randint(1, 10) + ('\nпродолжение' if i % 3 == 0 else '')
+                    for i in range(questions)]
+        options = [':'.join(f'Вариант {j+1} ' + 'x' * rnd.randint(1, 20) for j in range(x)) for x in options_counts]
+        if broken:
+            for i in range(0, questions, 10):
+                right_answers[i] = '99'
+                options[i] = options[i].replace(':', ': :', 1)
+        return f'bench-{questions}\n{questions}\n' + ' '.join(right_answers) + '\n' \
+            + '$' + ';\n'.join(wordings) + '$\n' \
+            + '~' + ';\n'.join(options) + '~'
+
+    def run(self, questions: int, broken: bool) -> dict:
+        message = self.message(questions, broken)
+        durations = []
+        for _ in range(self._repeat):
+            started = perf_counter()
+            try:
+                QuizBuilder.create_quiz_from_message(message)
+            except QuizCreationError:
+                if not broken:
+                    raise
+            durations.append(perf_counter() - started)
+        best = min(durations)
+        size = len(message.encode('utf-8')) / 1024
+        return {
+            'questions': questions,
+            'size_kb': round(size, 1),
+            'best_ms': round(best * 1000, 3),
+            'us_per_kb': round(best * 1_000_000 / size, 2)
+        }
+
+
+def main(args: argparse.Namespace) -> dict:
+    benchmark = QuizParserBenchmark(args.repeat, args.seed)
+    report = {'repeat': args.repeat}
+    for mode, broken in (('valid', False), ('broken', True)):
+        results = [benchmark.run(x, broken) for x in sorted(args.questions)]
+        for result in results:
+            result['scaling'] = round(result['us_per_kb'] / results[0]['us_per_kb'], 2)
+        report[mode] = results
+    return report
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(
+        description='Время разбора сообщения с квизом в зависимости от его размера.'
+    )
+    arg_parser.add_argument('--questions', type=int, nargs='+', default=[100, 1000, 10000, 50000],
+                            help='Размеры синтетических квизов (число вопросов)')
+    arg_parser.add_argument('--repeat', type=int, default=5,
+                            help='Число разборов каждого сообщения; в отчет попадает лучший')
+    arg_parser.add_argument('--seed', type=int, default=0,
+                            help='Зерно генератора синтетических квизов')
+    arg_parser.add_argument('--output', default='bench_parser.json',
+                            help='Файл, в который записываются результаты')
+    args = arg_parser.parse_args()
+
+    report = main(args)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    for mode in ('valid', 'broken'):
+        for result in report[mode]:
+            print(f'{mode} {result["questions"]}: {result["size_kb"]} KB, {result["best_ms"]} ms, '
+                  f'{result["us_per_kb"]} us/KB (x{result["scaling"]})')
@@ -1,100 +1,282 @@
 from core.utils import singleton
 from core.db import DBTool
 from core.logger import Logger
+from core.models import UserProfile, Quiz, Question, Page
+from core.cache import TTLCache, QuizCatalog
+from core.sessions import SessionStore, MemorySessionStore, QuizSession, QuizSessionExpiredError
+from core.export import ResultsExporter
+from core.metrics import Metrics
 
 
 @singleton
 class API:
-    __slots__ = ('_db', '_user_to_quiz')
+    __slots__ = ('_db', '_sessions', '_user_profiles', '_quiz_catalog', '_exports')
 
-    def __init__(self, db: DBTool) -> None:
+    def __init__(self,
+                 db: DBTool,
+                 user_cache_ttl: float = 60.0,
+                 user_cache_size: int = 10000,
+                 quiz_cache_revalidate: float = 5.0,
+                 session_store: SessionStore | None = None) -> None:
         self._db = db
-        self._user_to_quiz = {}
-
-    def init_quiz_creation(self, user_id: int) -> None:
-        self._db.set_admin_busyness(user_id, True)
-        Logger.log(f'Init quiz creation: {user_id}', 'info')
-    
-    def cancel_quiz_creation(self, user_id: int) -> None:
-        self._db.set_admin_busyness(user_id, False)
-        Logger.log(f'Canceled quiz creation: {user_id}', 'info')
-    
-    def get_admins_busyness(self, user_id: int) -> bool:
-        return self._db.get_admins_busyness(user_id)
-
-    def make_user_admin(self, user_id: int) -> None:
-        self._db.make_user_admin(user_id)
-
-    def add_user(self, user_id: int, username: int, name: str) -> None:
-        self._db.add_user(user_id, username, name)
-
-    def add_quiz(self,  quiz_data: dict) -> None:
-        self._db.add_quiz(**quiz_data)
-
-    def delete_quiz(self, quiz_id: str) -> None:
-        self._db.delete_quiz(quiz_id)
-        Logger.log(f'Deleted quiz: {quiz_id}', 'info')
-
-    def toggle_quiz_activity(self, quiz_id: str) -> None:
-        self._db.toggle_quiz_activity(quiz_id)
-        Logger.log(f'Changed status: {quiz_id}', 'info')
-
-    def get_all_quizzes(self) -> list[tuple]:
-        return self._db.get_all_quizzes()
-
-    def fetch_quiz(self, quiz_id: str) -> dict:
-        return self._db.fetch_quiz(quiz_id)
-
-    def get_quiz_results(self, quiz_id: str) -> list[tuple]:
-        return self._db.get_quiz_results(quiz_id)
-
-    def init_user_quiz(self, user_id: int, quiz_id: str) -> None:
-        self._user_to_quiz[user_id]=  [0, [], None, self._db.fetch_quiz(quiz_id)]
-        Logger.log(f'Started quiz: {user_id} ~ {quiz_id}', 'info')
-
-    def cancel_user_quiz(self, user_id: int) -> None:
-        self._user_to_quiz.pop(user_id)
-        Logger.log(f'Cancelled quiz: {user_id}', 'info')
-
-    def submit_user_results(self, user_id: int) -> None:
-        user_quiz_data = self._user_to_quiz[user_id]
-        self._db.submit_user_result(user_id, user_quiz_data[3]['quiz_id'], user_quiz_data[1])
-        Logger.log(f'Submitted result: {user_id}', 'info')
-
-    def restore_user_quiz_data(self, user_id: int) -> None:
-        self._user_to_quiz[user_id][0] -= 1
-        self._user_to_quiz[user_id][1].pop()
-
-    def update_user_quiz_data(self, user_id: int, answer: int) -> None:
-        self._user_to_quiz[user_id][0] += 1
-        self._user_to_quiz[user_id][1].append(answer)
-    
-    def get_user_quiz_info(self, user_id: int) -> tuple | None:
-        user_quiz_data = self._user_to_quiz[user_id]
-        quiz_data = user_quiz_data[3]
-
-        if user_quiz_data[0] == len(quiz_data['right_answers']):
+        self._sessions = MemorySessionStore() if session_store is None else session_store
+        self._user_profiles = TTLCache(user_cache_ttl, user_cache_size)
+        self._quiz_catalog = QuizCatalog(quiz_cache_revalidate)
+        self._exports = TTLCache(3600.0, 32)
+        self._register_metrics()
+
+    def _register_metrics(self) -> None:
+        metrics = Metrics()
+        metrics.gauge('quiz_sessions_active', lambda: len(self._sessions))
+        for name, cache in (('user_profiles', self._user_profiles),
+                            ('quiz_catalog', self._quiz_catalog),
+                            ('exports', self._exports)):
+            metrics.gauge('cache_hits_total', lambda cache=cache: cache.hits, {'cache': name})
+            metrics.gauge('cache_misses_total', lambda cache=cache: cache.misses, {'cache': name})
+
+    async def start(self) -> None:
+        await self._sessions.start()
+
+    async def close(self) -> None:
+        await self._sessions.close()
+
+    async def init_quiz_creation(self, user_id: int) -> None:
+        await self._db.set_admin_busyness(user_id, True)
+        self._user_profiles.pop(user_id)
+        Logger.log('Init quiz creation', 'info', user_id=user_id)
+
+    async def cancel_quiz_creation(self, user_id: int) -> None:
+        await self._db.set_admin_busyness(user_id, False)
+        self._user_profiles.pop(user_id)
+        Logger.log('Canceled quiz creation', 'info', user_id=user_id)
+
+    async def get_admins_busyness(self, user_id: int) -> bool:
+        return (await self.get_user_profile(user_id)).busy
+
+    async def make_user_admin(self, user_id: int) -> None:
+        await self._db.make_user_admin(user_id)
+        self._user_profiles.pop(user_id)
+
+    async def add_user(self, user_id: int, username: int, name: str) -> None:
+        await self._db.add_user(user_id, username, name)
+        self._user_profiles.pop(user_id)
+
+    async def add_quiz(self,  quiz_data: dict) -> None:
+        await self._db.add_quiz(**quiz_data)
+        self._quiz_catalog.invalidate()
+
+    async def add_quizzes(self, quizzes: list[dict], user_id: int | None = None) -> None:
+        await self._db.add_quizzes(quizzes)
+        self._quiz_catalog.invalidate()
+        Logger.log(f'Imported quizzes: {len(quizzes)}', 'info', user_id=user_id)
+
+    async def delete_quiz(self, quiz_id: str) -> None:
+        await self._db.delete_quiz(quiz_id)
+        self._quiz_catalog.invalidate()
+        Logger.log('Deleted quiz', 'info', quiz_id=quiz_id)
+
+    async def toggle_quiz_activity(self, quiz_id: str) -> None:
+        await self._db.toggle_quiz_activity(quiz_id)
+        self._quiz_catalog.invalidate()
+        Logger.log('Changed status', 'info', quiz_id=quiz_id)
+
+    async def _revalidate_quiz_catalog(self) -> None:
+        if self._quiz_catalog.needs_revalidation():
+            self._quiz_catalog.revalidate(await self._db.get_quizzes_signature())
+
+    async def get_all_quizzes(self) -> list[tuple]:
+        return await self._db.get_all_quizzes()
+
+    async def get_quizzes_stats(self) -> tuple[int, int]:
+        await self._revalidate_quiz_catalog()
+        signature = self._quiz_catalog.signature
+        if signature is None:
+            return 0, 0
+        return signature[0], signature[2]
+
+    async def get_quizzes_page(self,
+                               cursor: str | None = None,
+                               backward: bool = False,
+                               limit: int = 10,
+                               active_only: bool = False) -> tuple[int | None, Page]:
+        await self._revalidate_quiz_catalog()
+        generation = self._quiz_catalog.generation
+        key = (cursor, backward, limit, active_only)
+        page = self._quiz_catalog.get_page(key)
+        if page is None:
+            rows = await self._db.get_quizzes_page(cursor, backward, limit + 1, active_only)
+            if not rows and cursor is not None:
+                return await self.get_quizzes_page(None, False, limit, active_only)
+            page = Page.from_rows(rows, limit, cursor, backward)
+            self._quiz_catalog.set_page(key, page, generation)
+            if generation != self._quiz_catalog.generation:
+                generation = None
+        return generation, page
+
+    async def get_quizzes_to_pass_page(self,
+                                       user_id: int,
+                                       cursor: str | None = None,
+                                       backward: bool = False,
+                                       limit: int = 10) -> Page:
+        rows = await self._db.get_quizzes_page(cursor, backward, limit + 1, True, user_id)
+        if not rows and cursor is not None:
+            return await self.get_quizzes_to_pass_page(user_id, None, False, limit)
+        return Page.from_rows(rows, limit, cursor, backward)
+
+    async def fetch_quiz(self, quiz_id: str) -> Quiz | None:
+        await self._revalidate_quiz_catalog()
+        quiz = self._quiz_catalog.get(quiz_id)
+        if quiz is None:
+            generation = self._quiz_catalog.generation
+            quiz = await self._db.fetch_quiz(quiz_id)
+            if quiz is not None:
+                self._quiz_catalog.set(quiz, generation)
+        return quiz
+
+    async def fetch_question(self, quiz_id: str, index: int) -> Question | None:
+        question = self._quiz_catalog.get_question(quiz_id, index)
+        if question is None:
+            generation = self._quiz_catalog.generation
+            row = await self._db.fetch_question(quiz_id, index)
+            if row is not None:
+                question = Question(row[0], tuple(row[1]))
+                self._quiz_catalog.set_question(quiz_id, index, question, generation)
+        return question
+
+    async def fetch_questions(self, quiz_id: str) -> tuple[Question, ...]:
+        await self._revalidate_quiz_catalog()
+        questions = self._quiz_catalog.get_question(quiz_id, None)
+        if questions is None:
+            generation = self._quiz_catalog.generation
+            questions = tuple(Question(x[0], tuple(x[1])) for x in await self._db.fetch_questions(quiz_id))
+            self._quiz_catalog.set_question(quiz_id, None, questions, generation)
+        return questions
+
+    async def get_quiz_results(self,
+                               quiz_id: str,
+                               limit: int | None = None,
+                               offset: int = 0) -> list[tuple]:
+        return await self._db.get_quiz_results(quiz_id, limit, offset)
+
+    async def export_quiz_results(self,
+                                  quiz_id: str,
+                                  file_format: str = 'xlsx') -> tuple[str, bytes] | None:
+        quiz = await self.fetch_quiz(quiz_id)
+        if quiz is None:
             return None
+        signature = await self._db.get_quiz_results_signature(quiz_id)
+        cached = self._exports.get((quiz_id, file_format))
+        if cached is not None and cached[0] == signature:
+            return cached[1], cached[2]
+
+        if file_format == 'csv':
+            builder = ResultsExporter.to_csv
         else:
-            return next(iter(quiz_data['qa_pairs'][user_quiz_data[0]].items())), user_quiz_data[0] + 1
-
-    def change_user_real_name(self, user_id: int, real_name: str | None) -> None:
-        self._db.change_user_real_name(user_id, real_name)
-
-    def is_user_authorized(self, user_id: int) -> bool:
-        return self._db.is_user_authorized(user_id)
-    
-    def is_user_passed_quiz(self, user_id: int, quiz_id: str) -> bool:
-        return self._db.is_user_passed_quiz(user_id, quiz_id)
-
-    def is_user_have_real_name(self, user_id: int) -> bool:
-        return self._db.get_user_real_name(user_id) is None
-    
-    def is_user_admin(self, user_id: int) -> bool:
-        return self._db.is_user_admin(user_id)
-
-    def get_user_real_name(self, user_id: int) -> str:
-        return self._db.get_user_real_name(user_id)
-    
-    def get_all_users(self) -> list[tuple]:
-        return self._db.get_all_users()
\ No newline at end of file
+            builder = ResultsExporter.to_xlsx
+        questions = await self.fetch_questions(quiz_id)
+        content = await self._db.stream_quiz_results(
+            quiz_id, lambda rows: builder(questions, rows)
+        )
+        file_name = f'{quiz.name}.{file_format}'
+        self._exports.set((quiz_id, file_format), (signature, file_name, content))
+        return file_name, content
+
+    async def init_user_quiz(self, user_id: int, quiz_id: str) -> None:
+        await self._sessions.save(user_id, QuizSession(quiz_id))
+        Logger.log('Started quiz', 'info', user_id=user_id, quiz_id=quiz_id)
+
+    async def cancel_user_quiz(self, user_id: int) -> None:
+        await self._sessions.delete(user_id)
+        Logger.log('Cancelled quiz', 'info', user_id=user_id)
+
+    async def submit_user_results(self, user_id: int) -> tuple[int, int] | None:
+        session, quiz = await self._session_quiz(user_id)
+        answers = session.answers[:quiz.question_count]
+        correct, total = quiz.score(answers), quiz.question_count
+        if not await self._db.submit_user_result(user_id, quiz.quiz_id, correct, total, answers):
+            Logger.log('Failed to submit result', 'error', user_id=user_id, quiz_id=quiz.quiz_id)
+            return None
+        await self._sessions.delete(user_id)
+        Logger.log(f'Submitted result: {correct}/{total}', 'info', user_id=user_id, quiz_id=quiz.quiz_id)
+        return correct, total
+
+    async def restore_user_quiz_data(self, user_id: int) -> bool:
+        session = await self._sessions.get(user_id)
+        if session is None or not session.answers:
+            return False
+        session.answers.pop()
+        await self._sessions.save(user_id, session)
+        return True
+
+    async def update_user_quiz_data(self, user_id: int, answer: int) -> bool:
+        session = await self._sessions.get(user_id)
+        if session is None:
+            return False
+        session.answers.append(answer)
+        await self._sessions.save(user_id, session)
+        return True
+
+    async def get_user_quiz_info(self, user_id: int) -> tuple[Quiz, int, Question] | None:
+        session, quiz = await self._session_quiz(user_id)
+
+        if session.index >= quiz.question_count:
+            return None
+        question = await self.fetch_question(quiz.quiz_id, session.index)
+        if question is None:
+            if await self._db.fetch_quiz(quiz.quiz_id) is None:
+                await self._expire_user_quiz(user_id, quiz.quiz_id)
+            raise LookupError(f'Question {session.index} of quiz {quiz.quiz_id} not found')
+        return quiz, session.index, question
+
+    async def _session_quiz(self, user_id: int) -> tuple[QuizSession, Quiz]:
+        session = await self._sessions.get(user_id)
+        if session is None:
+            raise QuizSessionExpiredError('Quiz session not found')
+        quiz = await self.fetch_quiz(session.quiz_id)
+        if quiz is None:
+            await self._expire_user_quiz(user_id, session.quiz_id)
+        return session, quiz
+
+    async def _expire_user_quiz(self, user_id: int, quiz_id: str) -> None:
+        await self._sessions.delete(user_id)
+        Logger.log('Quiz session dropped: quiz no longer exists', 'info', user_id=user_id, quiz_id=quiz_id)
+        raise QuizSessionExpiredError('Quiz no longer exists')
+
+    async def change_user_real_name(self, user_id: int, real_name: str | None) -> None:
+        await self._db.change_user_real_name(user_id, real_name)
+        self._user_profiles.pop(user_id)
+
+    async def is_user_authorized(self, user_id: int) -> bool:
+        return (await self.get_user_profile(user_id)).authorized
+
+    async def get_quiz_access(self, user_id: int, quiz_id: str) -> tuple[bool, bool] | None:
+        return await self._db.get_quiz_access(user_id, quiz_id)
+
+    async def is_user_have_real_name(self, user_id: int) -> bool:
+        return (await self.get_user_profile(user_id)).real_name is None
+
+    async def is_user_admin(self, user_id: int) -> bool:
+        return (await self.get_user_profile(user_id)).admin
+
+    async def get_user_real_name(self, user_id: int) -> str:
+        return (await self.get_user_profile(user_id)).real_name
+
+    async def get_users_page(self,
+                             cursor: int | None = None,
+                             backward: bool = False,
+                             limit: int = 20) -> Page:
+        rows = await self._db.get_users_page(cursor, backward, limit + 1)
+        if not rows and cursor is not None:
+            return await self.get_users_page(None, False, limit)
+        return Page.from_rows(rows, limit, cursor, backward)
+
+    async def get_user_profile(self, user_id: int) -> UserProfile:
+        profile = self._user_profiles.get(user_id)
+        if profile is None:
+            row = await self._db.get_user_profile(user_id)
+            profile = UserProfile(True, *row) if row else UserProfile(False, False, False, None)
+            self._user_profiles.set(user_id, profile)
+        return profile
+
+    def peek_user_profile(self, user_id: int) -> UserProfile:
+        return self._user_profiles.peek(user_id, UserProfile(False, False, False, None))
@@ -1,42 +1,116 @@
 import re
-from io import BytesIO
-from openpyxl import Workbook
+import asyncio
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
-from telegram.ext import ApplicationBuilder,\
+from telegram.ext import Application, ApplicationBuilder,\
                          ContextTypes, CommandHandler,\
                          CallbackQueryHandler, MessageHandler,\
-                         filters
-from telegram.error import BadRequest
+                         TypeHandler, ApplicationHandlerStop, filters
+from telegram.error import BadRequest, TelegramError
 from core.base_api import API
 from core.utils import ADMIN_START_MENU_KEYBOARD, USER_START_MENU_KEYBOARD,\
-                       QUIZZES_MENU_KEYBOARD, ADMIN_PANEL_KEYBOARD
+                       QUIZZES_MENU_KEYBOARD, ADMIN_PANEL_KEYBOARD,\
+                       QUIZ_RESULTS_MESSAGE_LIMIT, LOGS_PAGE_SIZE,\
+                       USERS_PAGE_SIZE, QUIZZES_PAGE_SIZE, IMPORT_MAX_FILE_SIZE
 from core.filters import StartFilter, RealNameFilter, QuizCreationFilter, AdminFilter
 from core.quiz_builder import QuizBuilder, QuizCreationError
+from core.importer import QuizImporter, QuizImportError
 from core.logger import Logger
+from core.webhook import WebhookConfig
+from core.dispatcher import UserOrderedUpdateProcessor
+from core.rate_limiter import OutgoingRateLimiter
+from core.render import QuizRenderer
+from core.callbacks import CallbackCodec
+from core.models import Page
+from core.sessions import QuizSessionExpiredError
+from core.metrics import Metrics
 
 
 class QuizBot:
-    __slots__ = ('_api', '_app')
+    __slots__ = ('_api', '_app', '_renderer', '_callback_routes', '_metrics_address')
 
     def __init__(self,
                  token, api: API,
-                 admin_key: str) -> None:
-        self._app = ApplicationBuilder().token(token).build()
+                 admin_key: str,
+                 concurrent_updates: int = 32,
+                 rate_limiter: OutgoingRateLimiter | None = None,
+                 base_url: str | None = None,
+                 metrics_address: tuple[str, int] | None = None) -> None:
+        builder = ApplicationBuilder()\
+                  .token(token)\
+                  .concurrent_updates(UserOrderedUpdateProcessor(concurrent_updates))\
+                  .rate_limiter(OutgoingRateLimiter() if rate_limiter is None else rate_limiter)\
+                  .post_init(self._post_init)\
+                  .post_shutdown(self._post_shutdown)
+        if base_url is not None:
+            builder = builder.base_url(base_url)
+        self._app = builder.build()
         self._api = api
+        self._renderer = QuizRenderer()
+        self._metrics_address = metrics_address
         self._add_handlers(admin_key)
     
+    @property
+    def application(self) -> Application:
+        return self._app
+
+    async def _post_init(self, app: Application) -> None:
+        await self._api.start()
+        if self._metrics_address is not None:
+            await Metrics().start_server(*self._metrics_address)
+
+    async def _post_shutdown(self, app: Application) -> None:
+        await Metrics().stop_server()
+        await self._api.close()
+
     def _add_handlers(self, admin_key: str) -> None:
         start_filter = StartFilter(self._api)
         real_name_filter = RealNameFilter(self._api)
         admin_filter = AdminFilter(self._api)
         quiz_creation_filter = QuizCreationFilter(self._api)
 
-        self._app.add_handlers([
+        metrics = Metrics()
+        metrics.track_rate('updates_total')
+        self._callback_routes = {
+            'cancel': self._cancel,
+            'choose_quiz': self._show_quizzes_to_pass,
+            'toggle': self._toggle_quiz_activity,
+            'request_deletion': self._delete_confirmation,
+            'delete': self._delete_quiz,
+            'choose': self._init_user_quiz,
+            'manage': self._manage_quiz,
+            'download': self._download_quiz_results,
+            'results': self._get_quiz_results,
+            'answer': self._submit_quiz_answer,
+            'edit_real_name': self._change_user_real_name,
+            'quizzes_menu': self._quizzes_menu,
+            'create_quiz': self._init_quiz_creation,
+            'return': self._return,
+            'show_quizzes_to_manage': self._show_quizzes_to_manage,
+            'admin_panel': self._show_admin_panel,
+            'users_list': self._show_users_list,
+            'logs': self._show_logs,
+            'clear_logs': self._clear_logs,
+            'export_logs': self._download_logs,
+            'metrics': self._show_metrics,
+            'users_page': self._page_users_list,
+            'manage_page': self._page_quizzes_to_manage,
+            'pass_page': self._page_quizzes_to_pass
+        }
+        self._callback_routes = {
+            action: metrics.instrument_handler(callback)
+            for action, callback in self._callback_routes.items()
+        }
+
+        self._app.add_handler(TypeHandler(Update, self._load_user_profile), group=-1)
+        handlers = [
             CommandHandler(admin_key, self._make_user_admin),
             CommandHandler('menu', self._start_menu),
+            CommandHandler('logs', self._logs_command, admin_filter),
             CommandHandler('start', self._authorize_user, start_filter),
             MessageHandler(filters.TEXT & real_name_filter, self._set_user_real_name),
             MessageHandler(admin_filter & filters.TEXT & quiz_creation_filter, self._create_quiz),
+            MessageHandler(admin_filter & filters.Document.ALL & quiz_creation_filter, self._import_quizzes),
+            CallbackQueryHandler(self._route_callback, pattern=re.escape(CallbackCodec.marker)),
             CallbackQueryHandler(self._cancel, pattern='cancel:*'),
             CallbackQueryHandler(self._show_quizzes_to_pass, pattern='choose_quiz'),
             CallbackQueryHandler(self._toggle_quiz_activity, pattern='toggle:*'),
@@ -55,26 +129,83 @@ class QuizBot:
             CallbackQueryHandler(self._show_admin_panel, pattern='admin_panel'),
             CallbackQueryHandler(self._show_users_list, pattern='users_list'),
             CallbackQueryHandler(self._show_logs, pattern='logs:*'),
-            CallbackQueryHandler(self._clear_logs, pattern='clear_logs:*')
-        ])
-
-    async def _show_users_list(self,
-                               update: Update,
-                               context: ContextTypes.DEFAULT_TYPE):
-        chat_id = update.effective_chat.id
-        message_id = update.effective_message.id
-        users = self._api.get_all_users()
-
-        message = '\n'.join(f'[{x[0]}]({x[1]}) - {x[2]}{" (admin)" if x[3] else ""}'\
-                             for x in users)
+            CallbackQueryHandler(self._clear_logs, pattern='clear_logs:*'),
+            CallbackQueryHandler(self._download_logs, pattern='export_logs:*')
+        ]
+        for handler in handlers:
+            if handler.callback != self._route_callback:
+                handler.callback = metrics.instrument_handler(handler.callback)
+        self._app.add_handlers(handlers)
+
+    async def _route_callback(self,
+                              update: Update,
+                              context: ContextTypes.DEFAULT_TYPE):
+        try:
+            action, context.args = CallbackCodec.decode(update.callback_query.data)
+        except ValueError as err:
+            Logger.log(err, 'error', user_id=update.effective_user.id)
+            return
+        handler = self._callback_routes.get(action)
+        if handler is not None:
+            await handler(update, context)
+
+    @staticmethod
+    def _callback_args(update: Update, context: ContextTypes.DEFAULT_TYPE) -> list[str]:
+        if context.args is None:
+            context.args = CallbackCodec.decode(update.callback_query.data)[1]
+        return context.args
+
+    async def _load_user_profile(self,
+                                 update: Update,
+                                 context: ContextTypes.DEFAULT_TYPE):
+        Metrics().inc('updates_total')
+        if update.message is not None and update.effective_user is not None:
+            try:
+                await self._api.get_user_profile(update.effective_user.id)
+            except Exception as exc:
+                Logger.log(f'Failed to load user profile: {exc}', 'error', user_id=update.effective_user.id)
+                try:
+                    await context.bot.send_message(
+                        chat_id=update.effective_chat.id,
+                        text='Сервис временно недоступен. Попробуй позже.'
+                    )
+                except TelegramError:
+                    pass
+                raise ApplicationHandlerStop
+
+    @staticmethod
+    def _page_cursor(args: list[str]) -> tuple[str, bool] | None:
+        if len(args) != 2 or args[1] not in ('n', 'p'):
+            return None
+        return args[0], args[1] == 'p'
+
+    def _build_users_view(self,
+                          page: Page,
+                          refresh: tuple = ()) -> tuple[str, InlineKeyboardMarkup]:
+        message = f'Пользователи ({page.total}):\n' +\
+                  '\n'.join(f'[{x[1]}]({x[2]}) - {x[0]}{" (admin)" if x[3] else ""}'\
+                             for x in page.rows)
 
         keyboard = InlineKeyboardMarkup(
+            self._renderer.paging('users_page', page) +
             [
-                [InlineKeyboardButton('🔄 Обновить', callback_data='users_list')],
-                [InlineKeyboardButton('↩️ Назад', callback_data='return:admin_panel')],
-                [InlineKeyboardButton('🏠 Домой', callback_data='return:menu')]
+                [InlineKeyboardButton('🔄 Обновить', callback_data=CallbackCodec.encode(*refresh or ('users_list',)))],
+                [InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'admin_panel'))],
+                [InlineKeyboardButton('🏠 Домой', callback_data=CallbackCodec.encode('return', 'menu'))]
             ]
         )
+        return message, keyboard
+
+    async def _show_users_list(self,
+                               update: Update,
+                               context: ContextTypes.DEFAULT_TYPE,
+                               cursor: int | None = None,
+                               backward: bool = False):
+        chat_id = update.effective_chat.id
+        message_id = update.effective_message.id
+        page = await self._api.get_users_page(cursor, backward, USERS_PAGE_SIZE)
+        refresh = () if cursor is None else ('users_page', cursor, 'p' if backward else 'n')
+        message, keyboard = self._build_users_view(page, refresh)
 
         try:
             await context.bot.edit_message_text(
@@ -87,33 +218,84 @@ class QuizBot:
         except BadRequest:
             pass
 
+    async def _page_users_list(self,
+                               update: Update,
+                               context: ContextTypes.DEFAULT_TYPE):
+        cursor = self._page_cursor(self._callback_args(update, context))
+        try:
+            user_id = int(cursor[0])
+        except (TypeError, ValueError):
+            return
+        await self._show_users_list(update, context, user_id, cursor[1])
+
     async def _clear_logs(self,
                          update: Update,
                          context: ContextTypes.DEFAULT_TYPE):
-        log_type = update.callback_query.data.split(':')[1]
+        log_type = self._callback_args(update, context)[0]
+        if log_type not in Logger.log_types:
+            return
 
         Logger.clear_logs(log_type)
 
         await self._show_logs(update, context)
 
+    def _build_logs_view(self,
+                         log_type: str,
+                         mode: str = 't',
+                         offset: int | None = None,
+                         user_id: int | None = None) -> tuple[str, InlineKeyboardMarkup]:
+        try:
+            lines, start, end, size = Logger.read_page(
+                log_type,
+                None if mode == 't' else offset,
+                mode == 'n',
+                LOGS_PAGE_SIZE,
+                user_id=user_id
+            )
+        except FileNotFoundError:
+            lines, start, end, size = [], 0, 0, 0
+
+        message = '\n'.join(lines) if lines else 'Нет записей'
+        if user_id is not None:
+            message = f'Пользователь {user_id}:\n{message}'
+        suffix = () if user_id is None else (user_id,)
+
+        paging = []
+        if start > 0:
+            paging.append(InlineKeyboardButton('⬅️ Старее', callback_data=CallbackCodec.encode('logs', log_type, 'o', start, *suffix)))
+        if end < size:
+            paging.append(InlineKeyboardButton('Новее ➡️', callback_data=CallbackCodec.encode('logs', log_type, 'n', end, *suffix)))
+
+        keyboard = InlineKeyboardMarkup(
+            ([paging] if paging else []) +
+            [
+                [InlineKeyboardButton('🔄 Обновить', callback_data=CallbackCodec.encode('logs', log_type, 't', 0, *suffix))],
+                [InlineKeyboardButton('⬇️ Скачать полностью', callback_data=CallbackCodec.encode('export_logs', log_type))],
+                [InlineKeyboardButton('🧹 Очистить', callback_data=CallbackCodec.encode('clear_logs', log_type))],
+                [InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'admin_panel'))],
+                [InlineKeyboardButton('🏠 Домой', callback_data=CallbackCodec.encode('return', 'menu'))]
+            ]
+        )
+        return message, keyboard
+
     async def _show_logs(self,
                          update: Update,
                          context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        log_type = update.callback_query.data.split(':')[1]
+        args = self._callback_args(update, context)
+        log_type = args[0]
+        if log_type not in Logger.log_types:
+            return
 
-        with open(f'logs/{log_type}_logs.txt', 'r') as f:
-            message = '\n'.join(f.readlines())
+        try:
+            mode = args[1] if len(args) > 1 else 't'
+            offset = int(args[2]) if len(args) > 2 else None
+            user_id = int(args[3]) if len(args) > 3 else None
+        except ValueError:
+            return
 
-        keyboard = InlineKeyboardMarkup(
-            [
-                [InlineKeyboardButton('🔄 Обновить', callback_data=f'logs:{log_type}')],
-                [InlineKeyboardButton('🧹 Очистить', callback_data=f'clear_logs:{log_type}')],
-                [InlineKeyboardButton('↩️ Назад', callback_data='return:admin_panel')],
-                [InlineKeyboardButton('🏠 Домой', callback_data='return:menu')]
-            ]
-        )    
+        message, keyboard = self._build_logs_view(log_type, mode, offset, user_id)
 
         try:
             await context.bot.edit_message_text(
@@ -125,6 +307,54 @@ class QuizBot:
         except BadRequest:
             pass
 
+    async def _logs_command(self,
+                            update: Update,
+                            context: ContextTypes.DEFAULT_TYPE):
+        chat_id = update.effective_chat.id
+        args = context.args or []
+        log_type = args[0] if args else 'info'
+        try:
+            user_id = int(args[1]) if len(args) > 1 else None
+        except ValueError:
+            user_id = None
+            log_type = None
+
+        if log_type not in Logger.log_types:
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text='Формат команды: /logs [info|error|slow|trace] [id пользователя]'
+            )
+            return
+
+        message, keyboard = self._build_logs_view(log_type, user_id=user_id)
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text=message,
+            reply_markup=keyboard
+        )
+
+    async def _download_logs(self,
+                             update: Update,
+                             context: ContextTypes.DEFAULT_TYPE):
+        chat_id = update.effective_chat.id
+        log_type = self._callback_args(update, context)[0]
+        if log_type not in Logger.log_types:
+            return
+
+        try:
+            with open(Logger.get_file_name(log_type), 'rb') as f:
+                await context.bot.send_document(
+                    chat_id,
+                    document=f,
+                    filename=f'{log_type}_logs.jsonl'
+                )
+        except (FileNotFoundError, BadRequest):
+            await context.bot.answer_callback_query(
+                update.callback_query.id,
+                text='Файл с логами пуст',
+                show_alert=True
+            )
+
     async def _show_admin_panel(self,
                                update: Update,
                                context: ContextTypes.DEFAULT_TYPE):
@@ -139,11 +369,62 @@ class QuizBot:
             reply_markup=keyboard
         )
 
+    @staticmethod
+    def _build_metrics_view() -> str:
+        metrics = Metrics()
+
+        def hit_rate(cache: str) -> str:
+            hits = metrics.gauge_value('cache_hits_total', {'cache': cache})
+            misses = metrics.gauge_value('cache_misses_total', {'cache': cache})
+            return f'{hits / (hits + misses):.0%}' if hits + misses else '-'
+
+        def slowest(name: str) -> str:
+            rows = sorted(
+                ((label, h.quantile(0.95), h.count) for label, h in metrics.histograms(name).items()),
+                key=lambda x: x[1], reverse=True
+            )[:5]
+            return '\n'.join(f'• {label}: {p95 * 1000:.0f} мс (n={count})' for label, p95, count in rows) or '• -'
+
+        return f'📊 Метрики (за {metrics.uptime / 60:.0f} мин)\n\n' +\
+               f'Обновления: {metrics.counter_value("updates_total"):.0f} ' +\
+               f'({metrics.rate("updates_total"):.1f}/с за минуту)\n' +\
+               f'Активные сессии квизов: {metrics.gauge_value("quiz_sessions_active"):.0f}\n' +\
+               f'Кэш пользователей: {hit_rate("user_profiles")}, кэш квизов: {hit_rate("quiz_catalog")}\n' +\
+               f'Очередь Bot API: {metrics.gauge_value("bot_api_requests_queued"):.0f}, ' +\
+               f'отброшено правок: {metrics.gauge_value("bot_api_edits_dropped_total"):.0f}, ' +\
+               f'повторов: {metrics.gauge_value("bot_api_retries_total"):.0f}\n\n' +\
+               f'Обработчики (p95):\n{slowest("handler_duration_seconds")}\n\n' +\
+               f'Запросы к БД (p95):\n{slowest("db_query_duration_seconds")}\n\n' +\
+               f'Bot API (p95):\n{slowest("bot_api_duration_seconds")}'
+
+    async def _show_metrics(self,
+                            update: Update,
+                            context: ContextTypes.DEFAULT_TYPE):
+        chat_id = update.effective_chat.id
+        message_id = update.effective_message.id
+        keyboard = InlineKeyboardMarkup(
+            [
+                [InlineKeyboardButton('🔄 Обновить', callback_data=CallbackCodec.encode('metrics'))],
+                [InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'admin_panel'))],
+                [InlineKeyboardButton('🏠 Домой', callback_data=CallbackCodec.encode('return', 'menu'))]
+            ]
+        )
+
+        try:
+            await context.bot.edit_message_text(
+                text=self._build_metrics_view(),
+                chat_id=chat_id,
+                message_id=message_id,
+                reply_markup=keyboard
+            )
+        except BadRequest:
+            pass
+
     async def _make_user_admin(self,
                                update: Update,
                                context: ContextTypes.DEFAULT_TYPE):
         user_id = update.effective_user.id
-        self._api.make_user_admin(user_id)
+        await self._api.make_user_admin(user_id)
 
         await self._start_menu(update, context)
 
@@ -153,7 +434,7 @@ class QuizBot:
         chat_id = update.effective_chat.id
         user_id = update.effective_user.id
         message_id = update.effective_message.id
-        self._api.init_quiz_creation(user_id)
+        await self._api.init_quiz_creation(user_id)
 
         message = ("Ожидается сообщение следующего формата:\n\n"
                     "Название квиза\n"
@@ -161,17 +442,22 @@ class QuizBot:
                     "Номера правильных ответов (пробел в качестве разделителя)\n"
                     "[$Формулировка вопросов$] (Начало и конец секции - знак \"$\", точка с запятой в качестве разделителя формулировок)\n"
                     "[~Формулировка вариантов ответов~] (Начало и конец секции - знак \"~\", разделитель между вариантами - двоеточие, между вопросами - точка с запятой)]\n"        
-                    "Каждый из параметров вводится с новой строки.\n\n"
+                    "Каждый из параметров вводится с новой строки. Формулировки внутри секций могут занимать несколько строк, "
+                    "количество вариантов ответа у каждого вопроса может быть любым, но не меньше двух.\n\n"
                     "Параметры помещенные в квадратные скобки являются опциональными. Если их не задавать, будут использованы значения по умолчанию:\n"
                     "*для вопросов - \"Вопрос №1\", \"Вопрос №2\"... и так далее по указанному количеству вопросов;\n"
                     "*для формулировок вариантов ответов - для всех вопрос будут заданые значения от 1 до 4.\n"
                     "Ввиду ограничений Telegram, не рекомендуется делать варианты ответов длинее 35-40 символов."
                     "Если формулировка варианта ответа будет слишком длинной, то текст не будет переноситься в пределах кнопки,"
-                    " а будет обрезан многоточием.")
+                    " а будет обрезан многоточием.\n\n"
+                    "Вместо сообщения можно отправить файл xlsx, csv или json с одним или несколькими квизами:\n"
+                    "*xlsx/csv - первая строка заголовок, далее по строке на вопрос: название квиза, вопрос, номер правильного ответа, варианты ответов в следующих столбцах "
+                    "(пустое название - тот же квиз, что в строке выше);\n"
+                    "*json - список объектов {\"name\": ..., \"questions\": [{\"question\": ..., \"options\": [...], \"answer\": 1}]}.")
         
         keyboard = InlineKeyboardMarkup(
             [
-                [InlineKeyboardButton('❌ Отмена', callback_data='cancel:quiz_creation')]
+                [InlineKeyboardButton('❌ Отмена', callback_data=CallbackCodec.encode('cancel', 'quiz_creation'))]
             ]
         )
 
@@ -185,20 +471,20 @@ class QuizBot:
     async def _cancel(self,
                      update: Update,
                      context: ContextTypes.DEFAULT_TYPE):
-        cancel_type = update.callback_query.data.split(":")[1]
+        cancel_type = self._callback_args(update, context)[0]
         user_id = update.effective_user.id
 
         if cancel_type == 'quiz_creation':
-            self._api.cancel_quiz_creation(user_id)
+            await self._api.cancel_quiz_creation(user_id)
             await self._quizzes_menu(update, context)
         elif cancel_type == 'user_quiz':
-            self._api.cancel_user_quiz(user_id)
+            await self._api.cancel_user_quiz(user_id)
             await self._show_quizzes_to_pass(update, context)
 
     async def _return(self,
                      update: Update,
                      context: ContextTypes.DEFAULT_TYPE):
-        return_type = update.callback_query.data.split(":")[1]
+        return_type = self._callback_args(update, context)[0]
         message_id = update.effective_message.id
 
         if return_type == 'menu':
@@ -210,26 +496,29 @@ class QuizBot:
         elif return_type == 'admin_panel':
             await self._show_admin_panel(update, context)
         elif return_type == 'quiz':
-            self._api.restore_user_quiz_data(update.effective_user.id)
-            await self._send_quiz_question(update, context)
+            if await self._api.restore_user_quiz_data(update.effective_user.id):
+                await self._send_quiz_question(update, context)
+            else:
+                await self._quiz_session_expired(update, context)
 
     async def _toggle_quiz_activity(self,
                                     update: Update,
                                     context: ContextTypes.DEFAULT_TYPE):
-        quiz_id = quiz_id = update.callback_query.data.split(':')[1]
-        self._api.toggle_quiz_activity(quiz_id)
+        quiz_id = self._callback_args(update, context)[0]
+        await self._api.toggle_quiz_activity(quiz_id)
 
         await self._manage_quiz(update, context)
     
     async def _delete_quiz(self,
                            update: Update,
                            context: ContextTypes.DEFAULT_TYPE):
-        quiz_id = quiz_id = update.callback_query.data.split(':')[1]
-        self._api.delete_quiz(quiz_id)
+        quiz_id = self._callback_args(update, context)[0]
+        await self._api.delete_quiz(quiz_id)
+        self._renderer.forget(quiz_id)
 
-        quizzes = self._api.get_all_quizzes()
+        total, _ = await self._api.get_quizzes_stats()
 
-        if not quizzes:
+        if not total:
             await self._start_menu(update, context)
         else:
             await self._show_quizzes_to_manage(update, context)
@@ -238,28 +527,23 @@ class QuizBot:
                                      update: Update,
                                      context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
-        quiz_id = quiz_id = update.callback_query.data.split(':')[1]
-        results = self._api.get_quiz_results(quiz_id)
-
-        wb = Workbook()
-        sheet = wb.active
-        sheet['A1'] = 'ФИО'
-        sheet['B1'] = 'Телеграм'
-        sheet['C1'] = 'Результат'
-
-        for i, res in enumerate(results):
-            sheet[f'A{i+2}'] = res[0]
-            sheet[f'B{i+2}'] = res[1]
-            sheet[f'C{i+2}'] = res[2]
-        
-        excel_file = BytesIO()
-        wb.save(excel_file)
+        args = self._callback_args(update, context)
+        quiz_id = args[0]
+        file_format = 'csv' if args[1:] == ['csv'] else 'xlsx'
 
-        quiz_name = str(self._api.fetch_quiz(quiz_id)['name'])
+        export = await self._api.export_quiz_results(quiz_id, file_format)
+        if export is None:
+            await context.bot.answer_callback_query(
+                update.callback_query.id,
+                text='Квиз не найден',
+                show_alert=True
+            )
+            return
+        file_name, content = export
         await context.bot.send_document(
                     chat_id,
-                    document=excel_file.getvalue(),
-                    filename=f'{quiz_name}.xlsx'
+                    document=content,
+                    filename=file_name
         )
 
     async def _get_quiz_results(self,
@@ -267,8 +551,8 @@ class QuizBot:
                                 context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        quiz_id = quiz_id = update.callback_query.data.split(':')[1]
-        results = self._api.get_quiz_results(quiz_id)
+        quiz_id = self._callback_args(update, context)[0]
+        results = await self._api.get_quiz_results(quiz_id, QUIZ_RESULTS_MESSAGE_LIMIT)
 
         if not results:
             await context.bot.answer_callback_query(
@@ -277,15 +561,16 @@ class QuizBot:
                 show_alert=True
             )
         else:
-            message = '\n'.join(f'[{x[0]}]({x[1]}) - {x[2]}' for x in results)
+            message = '\n'.join(f'[{x[0]}]({x[1]}) - {x[2]}/{x[3]}' for x in results)
             if message == update.effective_message.text:
                 return
             keyboard = InlineKeyboardMarkup(
                 [
-                    [InlineKeyboardButton('⬇️ Скачать xlsx документ', callback_data=f'download:{quiz_id}')],
-                    [InlineKeyboardButton('🔄 Обновить', callback_data=f'results:{quiz_id}')],
-                    [InlineKeyboardButton('↩️ Назад', callback_data=f'manage:{quiz_id}'),
-                    InlineKeyboardButton('🏠 Домой', callback_data='return:menu')]
+                    [InlineKeyboardButton('⬇️ Скачать xlsx документ', callback_data=CallbackCodec.encode('download', quiz_id))],
+                    [InlineKeyboardButton('⬇️ Скачать csv документ', callback_data=CallbackCodec.encode('download', quiz_id, 'csv'))],
+                    [InlineKeyboardButton('🔄 Обновить', callback_data=CallbackCodec.encode('results', quiz_id))],
+                    [InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('manage', quiz_id)),
+                    InlineKeyboardButton('🏠 Домой', callback_data=CallbackCodec.encode('return', 'menu'))]
                 ]
             )
 
@@ -305,12 +590,12 @@ class QuizBot:
                                   context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        quiz_id = update.callback_query.data.split(':')[1]
+        quiz_id = self._callback_args(update, context)[0]
         
         keyboard = InlineKeyboardMarkup(
             [
-                [InlineKeyboardButton('✅ Да', callback_data=f'delete:{quiz_id}')],
-                [InlineKeyboardButton('❌ Нет', callback_data=f'manage:{quiz_id}')]
+                [InlineKeyboardButton('✅ Да', callback_data=CallbackCodec.encode('delete', quiz_id))],
+                [InlineKeyboardButton('❌ Нет', callback_data=CallbackCodec.encode('manage', quiz_id))]
             ]
         )
 
@@ -326,79 +611,69 @@ class QuizBot:
                            context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        quiz_id = quiz_id = update.callback_query.data.split(':')[1]
-        quiz_info = self._api.fetch_quiz(quiz_id)
-
-        message = f'*Название*: {quiz_info["name"]}\n\n*Вопросы*:\n'
-        for i, (x, y) in enumerate(zip(quiz_info['qa_pairs'], quiz_info['right_answers'])):
-            question, answers = next(iter((x.items())))
-            message += f'{i+1}. {question}\nВарианты ответов:\n•'
-            message += '\n•'.join(answers)
-            message += f'\n(Правильный ответ - {y})\n' 
-        message += '\n*Статус*: '
-        message += '🟩 (активен)' if quiz_info['is_active'] else '🟥 (неактивен)'
-
-        keyboard = InlineKeyboardMarkup(
-            [
-                [InlineKeyboardButton('🔄 Сменить статус', callback_data=f'toggle:{quiz_id}')],
-                [InlineKeyboardButton('📋 Получить результаты', callback_data=f'results:{quiz_id}')],
-                [InlineKeyboardButton('🗑️ Удалить', callback_data=f'request_deletion:{quiz_id}')],
-                [InlineKeyboardButton('↩️ Назад', callback_data='return:quizzes_to_manage'),
-                 InlineKeyboardButton('🏠 Домой', callback_data='return:menu')],
-            ]
+        args = self._callback_args(update, context)
+        quiz_id = args[0]
+        page = int(args[1]) if len(args) > 1 and args[1].isdecimal() else 0
+        quiz = await self._api.fetch_quiz(quiz_id)
+        if quiz is None:
+            await self._show_quizzes_to_manage(update, context)
+            return
+        message, keyboard = self._renderer.description(
+            quiz,
+            await self._api.fetch_questions(quiz_id),
+            page
         )
 
-        await context.bot.edit_message_text(
-            text=message,
-            chat_id=chat_id,
-            message_id=message_id,
-            reply_markup=keyboard,
-            parse_mode='Markdown'
-        )
+        try:
+            await context.bot.edit_message_text(
+                text=message,
+                chat_id=chat_id,
+                message_id=message_id,
+                reply_markup=keyboard,
+                parse_mode='Markdown'
+            )
+        except BadRequest as err:
+            if 'not modified' not in str(err):
+                Logger.log(f'Failed to show quiz description: {err}', 'error', quiz_id=quiz_id)
 
     async def _show_quizzes_to_manage(self,
                                       update: Update,
-                                      context: ContextTypes.DEFAULT_TYPE):
+                                      context: ContextTypes.DEFAULT_TYPE,
+                                      cursor: str | None = None,
+                                      backward: bool = False):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        quizzes = self._api.get_all_quizzes()
+        generation, page = await self._api.get_quizzes_page(cursor, backward, QUIZZES_PAGE_SIZE)
+        keyboard = self._renderer.quizzes_to_manage(generation, page)
 
-        if not quizzes:
+        if keyboard is None:
             await context.bot.answer_callback_query(
                 update.callback_query.id,
                 text='Нет созданных квизов',
                 show_alert=True
             )
         else:
-            keyboard = InlineKeyboardMarkup(
-                    [[InlineKeyboardButton(
-                        name, callback_data='manage:'+id
-                    )] for id, name, _  in quizzes
-                    ] + 
-                    [[InlineKeyboardButton('↩️ Назад', callback_data='return:quizzes_menu'),
-                     InlineKeyboardButton('🏠 Домой', callback_data='return:menu')]]
-                )
             await context.bot.edit_message_text(
                 chat_id=chat_id,
                 message_id=message_id,
-                text='Выбери квиз:',
+                text=f'Выбери квиз (всего {page.total}):',
                 reply_markup=keyboard
             )
 
+    async def _page_quizzes_to_manage(self,
+                                      update: Update,
+                                      context: ContextTypes.DEFAULT_TYPE):
+        cursor = self._page_cursor(self._callback_args(update, context))
+        if cursor is not None:
+            await self._show_quizzes_to_manage(update, context, *cursor)
+
     async def _quizzes_menu(self,
                             update: Update,
                             context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        quizzes = self._api.get_all_quizzes()
+        message = self._renderer.quizzes_overview(*await self._api.get_quizzes_stats())
 
-        if quizzes:
-            message = 'Доступные квизы:\n-' +\
-                      '\n-'.join(f'{name} ({"🟩" if is_active else "🟥"})' \
-                        for _, name, is_active in quizzes)
-        else:
-            message = 'Нет созданных квизов'
-        
         await context.bot.edit_message_text(
             chat_id=chat_id,
             message_id=message_id,
@@ -411,7 +686,7 @@ class QuizBot:
                                      context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        self._api.change_user_real_name(chat_id, None)
+        await self._api.change_user_real_name(chat_id, None)
 
         await context.bot.edit_message_text(
             chat_id=chat_id,
@@ -427,7 +702,7 @@ class QuizBot:
         try:
             quiz_data = QuizBuilder.\
                         create_quiz_from_message(update.effective_message.text)
-            self._api.add_quiz(quiz_data)
+            await self._api.add_quiz(quiz_data)
             await context.bot.send_message(
                 chat_id=chat_id,
                 text='Квиз успешно добавлен!'
@@ -436,36 +711,74 @@ class QuizBot:
         except QuizCreationError as err:
             await context.bot.send_message(
                 chat_id=chat_id,
-                text=f'{err}. Попробуй еще раз.'
+                text=f'{str(err)[:3900]}\n\nПопробуй еще раз.'
             )
         except Exception as exc:
-            Logger.log(exc, 'error')
+            Logger.log(exc, 'error', user_id=update.effective_user.id)
             await context.bot.send_message(
                 chat_id=chat_id,
                 text='Ошибка при создании квиза. Попробуй еще раз.'
             )
 
+    async def _import_quizzes(self,
+                              update: Update,
+                              context: ContextTypes.DEFAULT_TYPE):
+        chat_id = update.effective_chat.id
+        user_id = update.effective_user.id
+        document = update.effective_message.document
+
+        if document.file_size is not None and document.file_size > IMPORT_MAX_FILE_SIZE:
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text=f'Файл слишком большой (максимум {IMPORT_MAX_FILE_SIZE // (1024 * 1024)} МБ). Попробуй еще раз.'
+            )
+            return
+
+        try:
+            content = bytes(await (await document.get_file()).download_as_bytearray())
+            quizzes = await asyncio.get_running_loop().run_in_executor(
+                None, QuizImporter.parse, document.file_name or '', content
+            )
+            await self._api.add_quizzes(quizzes, user_id)
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text=f'Добавлено квизов: {len(quizzes)}'
+            )
+            await self._start_menu(update, context)
+        except (QuizImportError, QuizCreationError) as err:
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text=f'{str(err)[:3900]}\n\nПопробуй еще раз.'
+            )
+        except Exception as exc:
+            Logger.log(exc, 'error', user_id=user_id)
+            await context.bot.send_message(
+                chat_id=chat_id,
+                text='Ошибка при импорте квизов. Попробуй еще раз.'
+            )
+
     async def _start_menu(self,
                           update: Update, 
                           context: ContextTypes.DEFAULT_TYPE,
                           message_id: int = None):
         chat_id = update.effective_chat.id
         user_id = update.effective_user.id
-        
+        profile = await self._api.get_user_profile(user_id)
+        real_name = profile.real_name
+        keyboard = ADMIN_START_MENU_KEYBOARD if profile.admin else USER_START_MENU_KEYBOARD
+
         if message_id is None:
             await context.bot.send_message(
                 chat_id=chat_id,
-                text=f'Добро пожаловать,\n{self._api.get_user_real_name(user_id)}!',
-                reply_markup=ADMIN_START_MENU_KEYBOARD if self._api.is_user_admin(user_id)\
-                                                       else USER_START_MENU_KEYBOARD
+                text=f'Добро пожаловать,\n{real_name}!',
+                reply_markup=keyboard
             )
         else:
             await context.bot.edit_message_text(
                 chat_id=chat_id,
                 message_id = message_id,
-                text=f'Добро пожаловать,\n{self._api.get_user_real_name(chat_id)}!',
-                reply_markup=ADMIN_START_MENU_KEYBOARD if self._api.is_user_admin(user_id)\
-                                                       else USER_START_MENU_KEYBOARD
+                text=f'Добро пожаловать,\n{real_name}!',
+                reply_markup=keyboard
             )
 
     async def _set_user_real_name(self,
@@ -483,7 +796,7 @@ class QuizBot:
             )
         else:
             real_name = ' '.join(x.capitalize() for x in message_text.split() if x)
-            self._api.change_user_real_name(user_id, real_name)
+            await self._api.change_user_real_name(user_id, real_name)
             await self._start_menu(update, context)
 
     async def _authorize_user(self,
@@ -491,7 +804,7 @@ class QuizBot:
                               context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
 
-        self._api.add_user(
+        await self._api.add_user(
             update.effective_user.id,
             update.effective_user.username,
             update.effective_user.first_name
@@ -504,54 +817,56 @@ class QuizBot:
     
     async def _show_quizzes_to_pass(self,
                                     update: Update,
-                                    context: ContextTypes.DEFAULT_TYPE):
+                                    context: ContextTypes.DEFAULT_TYPE,
+                                    cursor: str | None = None,
+                                    backward: bool = False):
         chat_id = update.effective_chat.id
         message_id = update.effective_message.id
-        active_quizzes = list(filter(lambda x: x[2], self._api.get_all_quizzes()))
-        if not active_quizzes:
+        page = await self._api.get_quizzes_to_pass_page(
+            update.effective_user.id, cursor, backward, QUIZZES_PAGE_SIZE
+        )
+        keyboard = self._renderer.quizzes_to_pass(page)
+        if keyboard is None:
             await context.bot.answer_callback_query(
                 update.callback_query.id,
-                text='Нет активных квизов',
+                text='Нет доступных квизов',
                 show_alert=True
             )
         else:
-            keyboard = InlineKeyboardMarkup(
-                [[InlineKeyboardButton(
-                    name, callback_data='choose:'+id
-                )] for id, name, _ in active_quizzes] +
-                [[InlineKeyboardButton('↩️ Назад', callback_data='return:menu')]]
-            )
-
             await context.bot.edit_message_text(
                 chat_id=chat_id,
                 message_id=message_id,
-                text='Активные квизы:',
+                text=f'Доступные квизы (всего {page.total}):',
                 reply_markup=keyboard
             )
 
+    async def _page_quizzes_to_pass(self,
+                                    update: Update,
+                                    context: ContextTypes.DEFAULT_TYPE):
+        cursor = self._page_cursor(self._callback_args(update, context))
+        if cursor is not None:
+            await self._show_quizzes_to_pass(update, context, *cursor)
+
     async def _send_quiz_question(self,
                               update: Update, 
-                              context: ContextTypes.DEFAULT_TYPE):
+                              context: ContextTypes.DEFAULT_TYPE,
+                              quiz_info: tuple | None = None):
         chat_id = update.effective_chat.id
         user_id = update.effective_user.id
         message_id = update.effective_message.id
-        quiz_id = update.callback_query.data.split(':')[1]
 
-        quiz_info, question_number = self._api.get_user_quiz_info(user_id)
-        button = InlineKeyboardButton('❌ Отмена', callback_data='cancel:user_quiz')\
-                if question_number == 1 else\
-                InlineKeyboardButton('↩️ Назад', callback_data='return:quiz')
-        keyboard = InlineKeyboardMarkup(
-                [[InlineKeyboardButton(
-                    x, callback_data=f'quize:{quiz_id}:answer:{i+1}'
-                )]  for i, x in enumerate(quiz_info[1])] +\
-                [[button]]
-        )
+        if quiz_info is None:
+            try:
+                quiz_info = await self._api.get_user_quiz_info(user_id)
+            except QuizSessionExpiredError:
+                await self._quiz_session_expired(update, context)
+                return
+        text, keyboard = self._renderer.question(*quiz_info)
 
         await context.bot.edit_message_text(
                 chat_id=chat_id,
                 message_id=message_id,
-                text=quiz_info[0],
+                text=text,
                 reply_markup=keyboard
         )
 
@@ -559,42 +874,81 @@ class QuizBot:
                               update: Update, 
                               context: ContextTypes.DEFAULT_TYPE):
         user_id = update.effective_user.id
-        quiz_id = update.callback_query.data.split(':')[1]
+        quiz_id = self._callback_args(update, context)[0]
 
-        if self._api.is_user_passed_quiz(user_id, quiz_id):
+        access = await self._api.get_quiz_access(user_id, quiz_id)
+        if access is None or not access[0]:
+            await context.bot.answer_callback_query(
+                update.callback_query.id,
+                text='Квиз больше недоступен',
+                show_alert=True
+            )
+        elif access[1]:
             await context.bot.answer_callback_query(
                 update.callback_query.id,
                 text='Ты уже проходил этот квиз',
                 show_alert=True
             )
         else:
-            self._api.init_user_quiz(user_id, quiz_id)
+            await self._api.init_user_quiz(user_id, quiz_id)
             await self._send_quiz_question(update, context)
 
+    async def _quiz_session_expired(self,
+                                    update: Update,
+                                    context: ContextTypes.DEFAULT_TYPE):
+        await context.bot.answer_callback_query(
+            update.callback_query.id,
+            text='Время прохождения квиза истекло. Начни заново.',
+            show_alert=True
+        )
+        await self._start_menu(update, context, update.effective_message.id)
+
     async def _submit_quiz_answer(self,
                                   update: Update,
                                   context: ContextTypes.DEFAULT_TYPE):
         chat_id = update.effective_chat.id
         user_id = update.effective_user.id
         message_id = update.effective_message.id
-        callback_data = update.callback_query.data.split(':')
-        answer = int(callback_data[3])
+        answer = int(self._callback_args(update, context)[1])
 
-        self._api.update_user_quiz_data(user_id, answer)
-        quiz_info = self._api.get_user_quiz_info(user_id)
+        try:
+            if not await self._api.update_user_quiz_data(user_id, answer):
+                raise QuizSessionExpiredError('Quiz session not found')
+            quiz_info = await self._api.get_user_quiz_info(user_id)
+            if quiz_info is None and await self._api.submit_user_results(user_id) is None:
+                await self._api.restore_user_quiz_data(user_id)
+                await context.bot.answer_callback_query(
+                    update.callback_query.id,
+                    text='Не удалось сохранить результат. Попробуй ответить еще раз.',
+                    show_alert=True
+                )
+                return
+        except QuizSessionExpiredError:
+            await self._quiz_session_expired(update, context)
+            return
         if quiz_info is None:
             await context.bot.delete_message(chat_id, message_id)
             await context.bot.send_message(
             chat_id=chat_id,
             text='Спасибо за прохождения опроса! Жди результат :)'
             )
-            self._api.submit_user_results(user_id)
             await self._start_menu(update, context)
         else:
-            await self._send_quiz_question(update, context)
+            await self._send_quiz_question(update, context, quiz_info)
 
 
-    def run(self) -> None:
+    def run(self, webhook: WebhookConfig | None = None) -> None:
         Logger.log('Bot session started', 'info')
-        self._app.run_polling()
+        if webhook is None:
+            self._app.run_polling()
+        else:
+            self._app.run_webhook(
+                listen=webhook.listen,
+                port=webhook.port,
+                url_path=webhook.url_path,
+                webhook_url=webhook.webhook_url,
+                secret_token=webhook.secret_token,
+                max_connections=webhook.max_connections
+            )
         Logger.log('Bot session stoped', 'info')
+        Logger.shutdown()
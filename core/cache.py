@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from time import monotonic
+
+
+class TTLCache:
+    __slots__ = ('_data', '_ttl', '_max_size', 'hits', 'misses')
+
+    def __init__(self, ttl: float, max_size: int) -> None:
+        self._data = OrderedDict()
+        self._ttl = ttl
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None or item[0] < monotonic():
+            if item is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[1]
+
+    def peek(self, key, default=None):
+        item = self._data.get(key)
+        return default if item is None else item[1]
+
+    def set(self, key, value) -> None:
+        self._data[key] = (monotonic() + self._ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class QuizCatalog:
+    __slots__ = ('_quizzes', '_questions', '_pages', '_signature', '_checked_at',
+                 '_revalidate_interval', 'generation', 'hits', 'misses')
+
+    def __init__(self, revalidate_interval: float) -> None:
+        self._quizzes = {}
+        self._questions = {}
+        self._pages = {}
+        self._signature = None
+        self._checked_at = float('-inf')
+        self._revalidate_interval = revalidate_interval
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def signature(self) -> tuple | None:
+        return self._signature
+
+    def needs_revalidation(self) -> bool:
+        return monotonic() - self._checked_at >= self._revalidate_interval
+
+    def revalidate(self, signature: tuple) -> None:
+        if signature != self._signature:
+            self._clear()
+            self._signature = signature
+        self._checked_at = monotonic()
+
+    def invalidate(self) -> None:
+        self._clear()
+        self._signature = None
+        self._checked_at = float('-inf')
+
+    def _clear(self) -> None:
+        self._quizzes.clear()
+        self._questions.clear()
+        self._pages.clear()
+        self.generation += 1
+
+    def get(self, quiz_id: str):
+        quiz = self._quizzes.get(quiz_id)
+        if quiz is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return quiz
+
+    def set(self, quiz, generation: int) -> None:
+        if generation == self.generation:
+            self._quizzes[quiz.quiz_id] = quiz
+
+    def get_question(self, quiz_id: str, index: int | None):
+        question = self._questions.get((quiz_id, index))
+        if question is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return question
+
+    def set_question(self, quiz_id: str, index: int | None, question, generation: int) -> None:
+        if generation == self.generation:
+            self._questions[(quiz_id, index)] = question
+
+    def get_page(self, key: tuple):
+        page = self._pages.get(key)
+        if page is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return page
+
+    def set_page(self, key: tuple, page, generation: int) -> None:
+        if generation == self.generation:
+            self._pages[key] = page
@@ -0,0 +1,71 @@
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from uuid import UUID
+
+
+class CallbackCodec:
+    marker = '!'
+    actions = {
+        'cancel': 'c',
+        'choose_quiz': 'q',
+        'toggle': 't',
+        'request_deletion': 'r',
+        'delete': 'd',
+        'choose': 's',
+        'manage': 'm',
+        'download': 'x',
+        'results': 'R',
+        'answer': 'a',
+        'edit_real_name': 'e',
+        'quizzes_menu': 'Q',
+        'create_quiz': 'C',
+        'return': 'b',
+        'show_quizzes_to_manage': 'M',
+        'admin_panel': 'A',
+        'users_list': 'u',
+        'logs': 'l',
+        'clear_logs': 'L',
+        'export_logs': 'X',
+        'metrics': 'S',
+        'users_page': 'U',
+        'manage_page': 'P',
+        'pass_page': 'p'
+    }
+    quiz_actions = frozenset(
+        ('toggle', 'request_deletion', 'delete', 'choose', 'manage', 'download', 'results', 'answer',
+         'manage_page', 'pass_page')
+    )
+    _names = {code: name for name, code in actions.items()}
+
+    @staticmethod
+    def encode_quiz_id(quiz_id: str) -> str:
+        return urlsafe_b64encode(UUID(quiz_id).bytes).rstrip(b'=').decode()
+
+    @staticmethod
+    def decode_quiz_id(handle: str) -> str:
+        return str(UUID(bytes=urlsafe_b64decode(handle + '==')))
+
+    @staticmethod
+    def encode(action: str, *args) -> str:
+        args = [str(x) for x in args]
+        if args and action in CallbackCodec.quiz_actions:
+            args[0] = CallbackCodec.encode_quiz_id(args[0])
+        return CallbackCodec.marker + CallbackCodec.actions[action] + ':'.join(args)
+
+    @staticmethod
+    def decode(data: str) -> tuple[str, list[str]]:
+        if not data.startswith(CallbackCodec.marker):
+            return CallbackCodec._decode_legacy(data)
+        action = CallbackCodec._names.get(data[1:2])
+        if action is None:
+            raise ValueError(f'Unknown callback action: {data!r}')
+        args = data[2:].split(':') if len(data) > 2 else []
+        if args and action in CallbackCodec.quiz_actions:
+            args[0] = CallbackCodec.decode_quiz_id(args[0])
+        return action, args
+
+    @staticmethod
+    def _decode_legacy(data: str) -> tuple[str, list[str]]:
+        parts = data.split(':')
+        if parts[0] == 'quize':
+            return 'answer', [parts[1], parts[3]]
+        return parts[0], parts[1:]
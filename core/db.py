@@ -1,77 +1,347 @@
-import json
+import asyncio
+from time import perf_counter
+from random import random
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, Literal
 from uuid import uuid4
-from psycopg2 import connect
-from core.utils import singleton, INIT_DB_QUERY
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import execute_values
+from core.utils import singleton
+from core.migrator import Migrator
 from core.quiz_builder import QuizCreationError
 from core.logger import Logger
+from core.models import Quiz
+from core.metrics import Metrics
+from core.statements import PreparedConnection, StatementRegistry
 
 
 @singleton
 class DBTool:
-    __slots__ = ('_connection', '_cursor')
+    __slots__ = ('_pool', '_executor', '_semaphore', '_acquire_timeout',
+                 '_pending_results', '_results_writer_active', '_results_batch_size',
+                 '_trace_queries', '_slow_query_threshold', '_explain_sample_rate',
+                 '_statements')
 
     def __init__(self,
                  db_username: str,
                  db_password: str,
                  db_host: str,
                  db_port: str,
-                 db_name: str) -> None:
-        self._connection = connect(
+                 db_name: str,
+                 min_connections: int = 1,
+                 max_connections: int = 10,
+                 acquire_timeout: float = 5.0,
+                 results_batch_size: int = 500,
+                 trace_queries: bool = False,
+                 slow_query_threshold: float | None = 0.2,
+                 explain_sample_rate: float = 0.0,
+                 prepare_statements: bool = True) -> None:
+        self._pool = ThreadedConnectionPool(
+            min_connections,
+            max_connections,
             f'host={db_host} port={db_port} dbname={db_name} '+\
-            f'user={db_username} password={db_password}'
+            f'user={db_username} password={db_password}',
+            connection_factory=PreparedConnection
         )
-        self._cursor = self._connection.cursor()
-        self._execute(INIT_DB_QUERY)
-        Logger.log('DB connection created', 'info')
-    
-    def _execute(self, query: str, *args) -> bool:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_connections,
+            thread_name_prefix='db'
+        )
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._acquire_timeout = acquire_timeout
+        self._pending_results = []
+        self._results_writer_active = False
+        self._results_batch_size = results_batch_size
+        self._trace_queries = trace_queries
+        self._slow_query_threshold = slow_query_threshold
+        self._explain_sample_rate = explain_sample_rate
+        self._statements = StatementRegistry() if prepare_statements else None
+        connection = self._pool.getconn()
+        try:
+            Migrator(connection).apply()
+        finally:
+            self._pool.putconn(connection)
+        Logger.log('DB connection pool created', 'info')
+
+    def _getconn(self):
+        connection = self._pool.getconn()
+        if not connection.autocommit:
+            connection.autocommit = True
+        if self._statements is not None:
+            self._statements.prepare_all(connection)
+        return connection
+
+    def _putconn(self, connection) -> None:
+        if not connection.closed:
+            if not connection.autocommit:
+                connection.rollback()
+                connection.readonly = False
+                connection.autocommit = True
+        self._pool.putconn(connection, close=bool(connection.closed))
+
+    def _statement(self,
+                   connection,
+                   name: str,
+                   query: str,
+                   args: tuple,
+                   fetch: Literal['one', 'all'] | None = None,
+                   many: bool = False,
+                   in_transaction: bool = False) -> object:
+        statement = None
+        if self._statements is not None and not many:
+            statement = self._statements.get(name, query)
+            if statement is not None and statement.name not in connection.prepared:
+                if not self._statements.prepare(connection, statement, in_transaction):
+                    statement = None
+        started = perf_counter()
+        with connection.cursor() as cursor:
+            if many:
+                execute_values(cursor, query, args)
+            elif statement is not None:
+                cursor.execute(statement.execute, args)
+            else:
+                cursor.execute(query, args)
+            if fetch == 'one':
+                rows = cursor.fetchone()
+            elif fetch == 'all':
+                rows = cursor.fetchall()
+            else:
+                rows = cursor.rowcount
+            row_count = cursor.rowcount
+        self._trace(connection, name, query, args, many,
+                    perf_counter() - started, row_count, in_transaction)
+        return rows
+
+    def _run(self,
+             name: str,
+             query: str,
+             args: tuple,
+             fetch: Literal['one', 'all'] | None = None,
+             many: bool = False) -> tuple[bool, object]:
+        connection = self._getconn()
         try:
-            self._cursor.execute(query, args)
-            self._connection.commit()
-            return True
+            if many:
+                connection.autocommit = False
+                rows = self._statement(connection, name, query, args, fetch, many)
+                connection.commit()
+            else:
+                rows = self._statement(connection, name, query, args, fetch)
+            return True, rows
         except Exception as err:
-            Logger.log(err, 'error')
-            self._connection.rollback()
-            return False
+            Logger.log(f'{name}: {err}', 'error',
+                       details={'params': self._params_shape(args, many)})
+            if fetch is not None:
+                raise
+            return False, None
+        finally:
+            self._putconn(connection)
+
+    def _run_stream(self,
+                    name: str,
+                    query: str,
+                    args: tuple,
+                    consumer: Callable[[Iterable[tuple]], object]) -> object:
+        connection = self._getconn()
+        started = perf_counter()
+        try:
+            connection.autocommit = False
+            connection.readonly = True
+            with connection.cursor(name=f'stream_{uuid4().hex}') as cursor:
+                cursor.itersize = 1000
+                cursor.execute(query, args)
+                result = consumer(cursor)
+                row_count = cursor.rowcount
+            connection.commit()
+            self._trace(connection, name, query, args, False,
+                        perf_counter() - started, row_count, True)
+            return result
+        except Exception as err:
+            Logger.log(f'{name}: {err}', 'error',
+                       details={'params': self._params_shape(args, False)})
+            raise
+        finally:
+            self._putconn(connection)
+
+    @staticmethod
+    def _params_shape(args: tuple | list, many: bool) -> str:
+        if many:
+            first = args[0] if args else ()
+            return f'{len(args)} x (' + ', '.join(type(x).__name__ for x in first) + ')'
+        return '(' + ', '.join(
+            f'{type(x).__name__}[{len(x)}]' if isinstance(x, (list, tuple)) else type(x).__name__
+            for x in args
+        ) + ')'
+
+    def _trace(self,
+               connection,
+               name: str,
+               query: str,
+               args: tuple,
+               many: bool,
+               duration: float,
+               row_count: int,
+               in_transaction: bool) -> None:
+        slow = self._slow_query_threshold is not None and duration >= self._slow_query_threshold
+        if not self._trace_queries and not slow:
+            return
+
+        details = {
+            'query': name,
+            'duration_ms': round(duration * 1000, 2),
+            'rows': row_count,
+            'params': self._params_shape(args, many),
+            'in_transaction': in_transaction
+        }
+        message = f'{name}: {duration * 1000:.1f} ms, rows={row_count}'
+        if self._trace_queries:
+            Logger.log(message, 'trace', details=details)
+        if slow:
+            if not many and not in_transaction and random() < self._explain_sample_rate:
+                details['plan'] = self._explain(connection, query, args)
+            Logger.log(message, 'slow', details=details)
+
+    @staticmethod
+    def _explain(connection, query: str, args: tuple) -> str:
+        autocommit = connection.autocommit
+        connection.autocommit = False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN (ANALYZE, BUFFERS) ' + query, args)
+                return '\n'.join(row[0] for row in cursor.fetchall())
+        except Exception as err:
+            return f'EXPLAIN failed: {err}'
+        finally:
+            connection.rollback()
+            connection.autocommit = autocommit
+
+    async def _acquire(self, name: str) -> None:
+        started = perf_counter()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self._acquire_timeout)
+        except asyncio.TimeoutError:
+            Logger.log('DB connection pool acquire timeout', 'error')
+            Metrics().inc('db_pool_timeouts_total', {'query': name})
+            raise DBPoolTimeoutError('Нет свободных соединений с БД')
+        Metrics().observe('db_pool_wait_seconds', perf_counter() - started)
+
+    async def _call(self, name: str, func: Callable, *args) -> object:
+        started = perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, func, name, *args
+            )
+        finally:
+            Metrics().observe('db_query_duration_seconds', perf_counter() - started, {'query': name})
+
+    async def _submit(self, name: str, func: Callable, *args) -> object:
+        await self._acquire(name)
+        try:
+            return await self._call(name, func, *args)
+        finally:
+            self._semaphore.release()
+
+    async def _execute(self, name: str, query: str, *args) -> bool:
+        return (await self._submit(name, self._run, query, args))[0]
+
+    async def _fetchone(self, name: str, query: str, *args) -> tuple | None:
+        return (await self._submit(name, self._run, query, args, 'one'))[1]
+
+    async def _fetchall(self, name: str, query: str, *args) -> list[tuple]:
+        return (await self._submit(name, self._run, query, args, 'all'))[1] or []
+
+    async def _execute_values(self, name: str, query: str, rows: list[tuple]) -> bool:
+        return (await self._submit(name, self._run, query, rows, None, True))[0]
+
+    async def _stream(self,
+                      name: str,
+                      query: str,
+                      *args,
+                      consumer: Callable[[Iterable[tuple]], object]) -> object:
+        return await self._submit(name, self._run_stream, query, args, consumer)
+
+    def _begin(self, name: str, read_only: bool):
+        connection = self._getconn()
+        connection.autocommit = False
+        connection.readonly = read_only
+        return connection
+
+    def _finish(self, name: str, connection, commit: bool) -> None:
+        try:
+            if commit:
+                connection.commit()
+        finally:
+            self._putconn(connection)
+
+    @asynccontextmanager
+    async def transaction(self, read_only: bool = False) -> AsyncIterator['Transaction']:
+        await self._acquire('transaction')
+        try:
+            connection = await self._call('begin', self._begin, read_only)
+            try:
+                yield Transaction(self, connection)
+            except BaseException:
+                await self._call('rollback', self._finish, connection, False)
+                raise
+            await self._call('commit', self._finish, connection, True)
+        finally:
+            self._semaphore.release()
 
     def close_connection(self) -> None:
-        self._cursor.close()
-        self._connection.close()
-        Logger.log('DB connection closed', 'info')
+        self._executor.shutdown()
+        self._pool.closeall()
+        Logger.log('DB connection pool closed', 'info')
 
-    def add_user(self,
-                 user_id: int,
-                 username: str,
-                 name: str) -> None:
-        self._execute(
+    async def add_user(self,
+                       user_id: int,
+                       username: str,
+                       name: str) -> None:
+        await self._execute(
+            'add_user',
             """
             INSERT INTO users (user_id, username, name)
             VALUES (%s, %s, %s);
             """, user_id, username, name
         )
-    
-    def is_user_authorized(self, user_id: int) -> bool:
-        self._execute(
+
+    async def get_user_profile(self, user_id: int) -> tuple | None:
+        return await self._fetchone(
+            'get_user_profile',
             """
-            SELECT %s IN (SELECT user_id FROM users);
+            SELECT
+                a.user_id IS NOT NULL,
+                COALESCE(a.is_busy, FALSE),
+                u.real_name
+            FROM
+                users u
+            LEFT JOIN admins a
+            USING(user_id)
+            WHERE
+                u.user_id = %s;
             """, user_id
         )
-        return self._cursor.fetchone()[0]
-    
-    def is_user_passed_quiz(self, user_id: int, quiz_id: str) -> bool:
-        self._execute(
+
+    async def get_quiz_access(self, user_id: int, quiz_id: str) -> tuple | None:
+        return await self._fetchone(
+            'get_quiz_access',
             """
-            SELECT %s IN (
-                SELECT user_id
-                FROM results
-                WHERE user_id = %s AND quiz_id = %s
-            );
-            """, user_id, user_id, quiz_id
+            SELECT
+                q.is_active,
+                EXISTS (
+                    SELECT 1
+                    FROM results r
+                    WHERE r.user_id = %s AND r.quiz_id = q.quiz_id
+                )
+            FROM
+                quizzes q
+            WHERE
+                q.quiz_id = %s;
+            """, user_id, quiz_id
         )
-        return self._cursor.fetchone()[0]
 
-    def change_user_real_name(self, user_id: int, real_name: str | None) -> None:
-        self._execute(
+    async def change_user_real_name(self, user_id: int, real_name: str | None) -> None:
+        await self._execute(
+            'change_user_real_name',
             """
             UPDATE users
             SET real_name = %s
@@ -79,106 +349,216 @@ class DBTool:
             """, real_name, user_id
         )
 
-    def get_user_real_name(self, user_id: int) -> str:
-        self._execute(
-            """
-            SELECT real_name
-            FROM users
-            WHERE user_id = %s;
-            """, user_id
-        )
-        return self._cursor.fetchone()[0]
+    async def add_quiz(self,
+                       name: str,
+                       right_answers: list[int],
+                       questions: list[tuple[str, list[str]]]) -> None:
+        await self.add_quizzes([{'name': name, 'right_answers': right_answers, 'questions': questions}])
 
-    def add_quiz(self,
-                 name: str,
-                 right_answers: list[int],
-                 qa_pairs: list[dict[str:list]]) -> None:
-        if not self._execute(
-            """
-            INSERT INTO quizzes (quiz_id, name, right_answers, qa_pairs)
-            VALUES (%s, %s, %s, %s);
-            """, str(uuid4()), name, right_answers, json.dumps(qa_pairs)
-        ):
+    async def add_quizzes(self, quizzes: list[dict]) -> None:
+        rows = [(str(uuid4()), x['name'], x['right_answers'], x['questions']) for x in quizzes]
+        try:
+            async with self.transaction() as tx:
+                existing = await tx.fetchall(
+                    'find_quiz_names',
+                    """
+                    SELECT name
+                    FROM quizzes
+                    WHERE name = ANY(%s);
+                    """, [name for _, name, _, _ in rows]
+                )
+                if existing:
+                    raise QuizCreationError(
+                        'Квиз с таким именем уже существует: ' + ', '.join(x[0] for x in existing)
+                    )
+                await tx.execute_values(
+                    'add_quizzes',
+                    """
+                    INSERT INTO quizzes (quiz_id, name, right_answers)
+                    VALUES %s;
+                    """, [(quiz_id, name, right_answers) for quiz_id, name, right_answers, _ in rows]
+                )
+                await tx.execute_values(
+                    'add_quiz_questions',
+                    """
+                    INSERT INTO quiz_questions (quiz_id, position, wording)
+                    VALUES %s;
+                    """, [(quiz_id, i, wording)
+                          for quiz_id, _, _, questions in rows
+                          for i, (wording, _) in enumerate(questions)]
+                )
+                await tx.execute_values(
+                    'add_quiz_options',
+                    """
+                    INSERT INTO quiz_options (quiz_id, position, option_index, wording)
+                    VALUES %s;
+                    """, [(quiz_id, i, j+1, option)
+                          for quiz_id, _, _, questions in rows
+                          for i, (_, options) in enumerate(questions)
+                          for j, option in enumerate(options)]
+                )
+        except (QuizCreationError, DBPoolTimeoutError):
+            raise
+        except Exception:
             raise QuizCreationError('Квиз с таким именем уже существует')
 
-    def fetch_quiz(self, quiz_id: str) -> dict:
-        self._execute(
+    async def fetch_quiz(self, quiz_id: str) -> Quiz | None:
+        quiz_data = await self._fetchone(
+            'fetch_quiz',
             """
             SELECT
-                name, right_answers, qa_pairs, is_active
+                name, right_answers, is_active, version
             FROM
                 quizzes
             WHERE
                 quiz_id = %s;
             """, quiz_id
         )
-        quiz_data = self._cursor.fetchone()
 
-        return {
-            'quiz_id': quiz_id,
-            'name': quiz_data[0],
-            'right_answers': quiz_data[1],
-            'qa_pairs': quiz_data[2],
-            'is_active': quiz_data[3]
-        }
+        return Quiz.from_row(quiz_id, *quiz_data) if quiz_data else None
 
-    def toggle_quiz_activity(self, quiz_id: str) -> None:
-        self._execute(
+    async def fetch_question(self, quiz_id: str, index: int) -> tuple | None:
+        return await self._fetchone(
+            'fetch_question',
             """
-            UPDATE quizzes
-            SET is_active = NOT is_active
-            WHERE quiz_id = %s;
-            """, quiz_id
+            SELECT
+                q.wording,
+                ARRAY(
+                    SELECT o.wording
+                    FROM quiz_options o
+                    WHERE o.quiz_id = q.quiz_id AND o.position = q.position
+                    ORDER BY o.option_index
+                )
+            FROM
+                quiz_questions q
+            WHERE
+                q.quiz_id = %s AND q.position = %s;
+            """, quiz_id, index
         )
 
-    def delete_quiz(self, quiz_id: str) -> None:
-        self._execute(
+    async def fetch_questions(self, quiz_id: str) -> list[tuple]:
+        return await self._fetchall(
+            'fetch_questions',
             """
-            DELETE FROM quizzes
-            WHERE quiz_id = %s;
+            SELECT
+                q.wording,
+                ARRAY(
+                    SELECT o.wording
+                    FROM quiz_options o
+                    WHERE o.quiz_id = q.quiz_id AND o.position = q.position
+                    ORDER BY o.option_index
+                )
+            FROM
+                quiz_questions q
+            WHERE
+                q.quiz_id = %s
+            ORDER BY q.position;
             """, quiz_id
         )
 
-    def _check_user_answers(self,
-                            quiz_id: str,
-                            user_answers: list[int]) -> str:
-        self._execute(
+    async def get_quizzes_signature(self) -> tuple:
+        return await self._fetchone(
+            'get_quizzes_signature',
+            """
+            SELECT
+                COUNT(*),
+                COALESCE(MAX(version), 0),
+                COUNT(*) FILTER (WHERE is_active)
+            FROM quizzes;
+            """
+        )
+
+    async def toggle_quiz_activity(self, quiz_id: str) -> None:
+        await self._execute(
+            'toggle_quiz_activity',
             """
-            SELECT right_answers
-            FROM quizzes
+            UPDATE quizzes
+            SET
+                is_active = NOT is_active,
+                version = nextval('quiz_version_seq')
             WHERE quiz_id = %s;
             """, quiz_id
         )
-        right_answers = self._cursor.fetchone()[0]
-        user_right_answers_counter = 0
-        for u, r in zip(user_answers, right_answers):
-            user_right_answers_counter += int(u==r)
-        
-        return f'{user_right_answers_counter}/{len(right_answers)}'
 
+    async def delete_quiz(self, quiz_id: str) -> None:
+        async with self.transaction() as tx:
+            await tx.execute(
+                'delete_quiz_sessions_by_quiz',
+                """
+                DELETE FROM quiz_sessions
+                WHERE quiz_id = %s;
+                """, quiz_id
+            )
+            await tx.execute(
+                'delete_quiz',
+                """
+                DELETE FROM quizzes
+                WHERE quiz_id = %s;
+                """, quiz_id
+            )
+
+    async def submit_user_result(self,
+                                 user_id: int,
+                                 quiz_id: str,
+                                 correct: int,
+                                 total: int,
+                                 user_answers: list[int]) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        self._pending_results.append(
+            ((user_id, quiz_id, correct, total, list(user_answers)), future)
+        )
+        if not self._results_writer_active:
+            self._results_writer_active = True
+            asyncio.create_task(self._write_pending_results())
+        return await future
+
+    async def _write_pending_results(self) -> None:
+        try:
+            while self._pending_results:
+                batch = self._pending_results[:self._results_batch_size]
+                del self._pending_results[:len(batch)]
+                try:
+                    ok = await self._insert_results([row for row, _ in batch])
+                    if not ok and len(batch) > 1:
+                        for row, future in batch:
+                            result = await self._insert_results([row])
+                            if not future.done():
+                                future.set_result(result)
+                        continue
+                except Exception as err:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(err)
+                    continue
+                for _, future in batch:
+                    if not future.done():
+                        future.set_result(ok)
+        finally:
+            self._results_writer_active = False
 
-    def submit_user_result(self,
-                          user_id: int,
-                          quiz_id: str,
-                          user_answers: list[int]) -> None:
-        user_result = self._check_user_answers(quiz_id, user_answers)
-        self._execute(
+    async def _insert_results(self, rows: list[tuple]) -> bool:
+        return await self._execute_values(
+            'insert_results',
             """
-            INSERT INTO results (user_id, quiz_id, result)
-            VALUES (%s, %s, %s);
-            """, user_id, quiz_id, user_result
+            INSERT INTO results (user_id, quiz_id, correct, total, answers)
+            VALUES %s
+            ON CONFLICT (user_id, quiz_id) DO NOTHING;
+            """, rows
         )
 
-    def make_user_admin(self, user_id: int) -> None:
-        self._execute(
+    async def make_user_admin(self, user_id: int) -> None:
+        await self._execute(
+            'make_user_admin',
             """
             INSERT INTO admins (user_id)
-            VALUES (%s);
+            VALUES (%s)
+            ON CONFLICT (user_id) DO NOTHING;
             """, user_id
         )
-    
-    def set_admin_busyness(self, user_id: int, is_busy: bool) -> None:
-        self._execute(
+
+    async def set_admin_busyness(self, user_id: int, is_busy: bool) -> None:
+        await self._execute(
+            'set_admin_busyness',
             """
             UPDATE admins
             SET is_busy = %s
@@ -186,65 +566,217 @@ class DBTool:
             """, is_busy, user_id
         )
 
-    def get_admins_busyness(self, user_id: int) -> bool:
-        self._execute(
-            """
-            SELECT is_busy
-            FROM admins
-            WHERE user_id = %s;
-            """, user_id
+    async def get_users_page(self,
+                             cursor: int | None,
+                             backward: bool,
+                             limit: int) -> list[tuple]:
+        if cursor is None:
+            condition, args = '', (limit,)
+        else:
+            condition, args = f'WHERE u.user_id {"<" if backward else ">"} %s', (cursor, limit)
+        return await self._fetchall(
+            'get_users_page',
+            f"""
+            SELECT
+                u.user_id, u.real_name, CONCAT('https://t.me/', u.username),
+                a.user_id IS NOT NULL,
+                (SELECT COUNT(*) FROM users)
+            FROM
+                users u
+            LEFT JOIN admins a
+            USING(user_id)
+            {condition}
+            ORDER BY u.user_id {"DESC" if backward else ""}
+            LIMIT %s;
+            """, *args
         )
-        return self._cursor.fetchone()[0]
 
-    def is_user_admin(self, user_id: int) -> bool:
-        self._execute(
+    async def get_all_quizzes(self) -> list[tuple]:
+        return await self._fetchall(
+            'get_all_quizzes',
             """
-            SELECT %s IN (SELECT user_id FROM admins);
-            """, user_id
+            SELECT quiz_id, name, is_active
+            FROM quizzes;
+            """
+        )
+
+    async def get_quizzes_page(self,
+                               cursor: str | None,
+                               backward: bool,
+                               limit: int,
+                               active_only: bool = False,
+                               not_passed_by: int | None = None) -> list[tuple]:
+        filters, filter_args = ['q.is_active'] if active_only else [], []
+        if not_passed_by is not None:
+            filters.append(
+                'NOT EXISTS (SELECT 1 FROM results r WHERE r.user_id = %s AND r.quiz_id = q.quiz_id)'
+            )
+            filter_args.append(not_passed_by)
+        conditions, args = list(filters), list(filter_args)
+        if cursor is not None:
+            conditions.append(
+                f'q.name {"<" if backward else ">"} (SELECT name FROM quizzes WHERE quiz_id = %s)'
+            )
+            args.append(cursor)
+        count_where = 'WHERE ' + ' AND '.join(filters) if filters else ''
+        where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+        return await self._fetchall(
+            'get_quizzes_page',
+            f"""
+            SELECT
+                q.quiz_id, q.name, q.is_active,
+                (SELECT COUNT(*) FROM quizzes q {count_where})
+            FROM
+                quizzes q
+            {where}
+            ORDER BY q.name {"DESC" if backward else ""}
+            LIMIT %s;
+            """, *filter_args, *args, limit
         )
-        flag = self._cursor.fetchone()[0]
-        return flag
 
-    def get_all_users(self) -> list[tuple]:
-        self._execute(
+    async def get_quiz_results(self,
+                               quiz_id: str,
+                               limit: int | None = None,
+                               offset: int = 0) -> list[tuple]:
+        return await self._fetchall(
+            'get_quiz_results',
             """
             SELECT
-                u.real_name, CONCAT('https://t.me/', u.username), u.user_id,
-                CASE
-                    WHEN a.user_id IS NOT NULL then TRUE
-                    ELSE FALSE END
+                u.real_name,
+                CONCAT('https://t.me/', u.username),
+                r.correct,
+                r.total,
+                r.submitted_at
             FROM
+                results r
+            JOIN
                 users u
-            LEFT JOIN admins a
-            USING(user_id);
-            """
+            USING(user_id)
+            WHERE
+                r.quiz_id = %s
+            ORDER BY r.correct DESC, r.submitted_at
+            LIMIT %s OFFSET %s;
+            """, quiz_id, limit, offset
         )
-        return self._cursor.fetchall()
 
-    def get_all_quizzes(self) -> list[tuple]:
-        self._execute(
-            """
-            SELECT quiz_id, name, is_active
-            FROM quizzes; 
+    async def get_quiz_results_signature(self, quiz_id: str) -> tuple:
+        return await self._fetchone(
+            'get_quiz_results_signature',
             """
+            SELECT COUNT(*), MAX(submitted_at)
+            FROM results
+            WHERE quiz_id = %s;
+            """, quiz_id
         )
-        return self._cursor.fetchall()
-    
-    def get_quiz_results(self, quiz_id: str) -> list[tuple]:
-        self._execute(
+
+    async def stream_quiz_results(self,
+                                  quiz_id: str,
+                                  consumer: Callable[[Iterable[tuple]], object]) -> object:
+        return await self._stream(
+            'stream_quiz_results',
             """
-            SELECT 
+            SELECT
                 u.real_name,
                 CONCAT('https://t.me/', u.username),
-                r.result
+                r.correct,
+                r.total,
+                r.submitted_at,
+                r.answers
             FROM
                 results r
             JOIN
                 users u
             USING(user_id)
             WHERE
-                quiz_id = %s
-            ORDER BY CAST(split_part(r.result, '/', 1) AS INTEGER) DESC;
-            """, quiz_id
+                r.quiz_id = %s
+            ORDER BY r.correct DESC, r.submitted_at;
+            """, quiz_id, consumer=consumer
         )
-        return self._cursor.fetchall()
+
+    async def sync_quiz_sessions(self, saved: list[tuple], deleted: list[int]) -> bool:
+        try:
+            async with self.transaction() as tx:
+                if saved:
+                    await tx.execute_values(
+                        'save_quiz_sessions',
+                        """
+                        INSERT INTO quiz_sessions (user_id, quiz_id, answers, updated_at)
+                        VALUES %s
+                        ON CONFLICT (user_id) DO UPDATE
+                        SET
+                            quiz_id = EXCLUDED.quiz_id,
+                            answers = EXCLUDED.answers,
+                            updated_at = EXCLUDED.updated_at;
+                        """, saved
+                    )
+                if deleted:
+                    await tx.execute(
+                        'delete_quiz_sessions',
+                        """
+                        DELETE FROM quiz_sessions
+                        WHERE user_id = ANY(%s);
+                        """, deleted
+                    )
+        except Exception:
+            return False
+        return True
+
+    async def load_quiz_session(self, user_id: int, ttl: float) -> tuple | None:
+        return await self._fetchone(
+            'load_quiz_session',
+            """
+            SELECT quiz_id, answers, EXTRACT(EPOCH FROM updated_at)
+            FROM quiz_sessions
+            WHERE
+                user_id = %s
+                AND updated_at >= now() - make_interval(secs => %s);
+            """, user_id, ttl
+        )
+
+    async def delete_expired_quiz_sessions(self, ttl: float) -> None:
+        await self._execute(
+            'delete_expired_quiz_sessions',
+            """
+            DELETE FROM quiz_sessions
+            WHERE updated_at < now() - make_interval(secs => %s);
+            """, ttl
+        )
+
+
+class Transaction:
+    __slots__ = ('_db', '_connection')
+
+    def __init__(self, db: DBTool, connection) -> None:
+        self._db = db
+        self._connection = connection
+
+    async def _statement(self, name: str, query: str, args: tuple,
+                         fetch: Literal['one', 'all'] | None = None,
+                         many: bool = False) -> object:
+        return await self._db._call(name, self._run, query, args, fetch, many)
+
+    def _run(self, name: str, query: str, args: tuple,
+             fetch: Literal['one', 'all'] | None, many: bool) -> object:
+        try:
+            return self._db._statement(self._connection, name, query, args, fetch, many, True)
+        except Exception as err:
+            Logger.log(f'{name}: {err}', 'error',
+                       details={'params': self._db._params_shape(args, many)})
+            raise
+
+    async def execute(self, name: str, query: str, *args) -> int:
+        return await self._statement(name, query, args)
+
+    async def fetchone(self, name: str, query: str, *args) -> tuple | None:
+        return await self._statement(name, query, args, 'one')
+
+    async def fetchall(self, name: str, query: str, *args) -> list[tuple]:
+        return await self._statement(name, query, args, 'all')
+
+    async def execute_values(self, name: str, query: str, rows: list[tuple]) -> int:
+        return await self._statement(name, query, rows, None, True)
+
+
+class DBPoolTimeoutError(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
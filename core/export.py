@@ -0,0 +1,47 @@
+import csv
+from datetime import datetime
+from io import BytesIO, StringIO
+from typing import Iterable
+from openpyxl import Workbook
+from core.models import Question
+
+
+class ResultsExporter:
+    @staticmethod
+    def _header(questions: tuple[Question, ...]) -> list[str]:
+        return ['ФИО', 'Телеграм', 'Правильных ответов', 'Всего вопросов', 'Дата прохождения'] +\
+               [f'Вопрос {i+1}' for i in range(len(questions))]
+
+    @staticmethod
+    def _row(questions: tuple[Question, ...], row: tuple) -> list:
+        real_name, link, correct, total, submitted_at, answers = row
+        if submitted_at is not None:
+            submitted_at = submitted_at.astimezone().replace(tzinfo=None)
+        chosen = []
+        for (_, options), answer in zip(questions, answers or ()):
+            chosen.append(options[answer-1] if 0 < answer <= len(options) else answer)
+        return [real_name, link, correct, total, submitted_at] + chosen
+
+    @staticmethod
+    def to_xlsx(questions: tuple[Question, ...], rows: Iterable[tuple]) -> bytes:
+        wb = Workbook(write_only=True)
+        sheet = wb.create_sheet('Результаты')
+        sheet.append(ResultsExporter._header(questions))
+        for row in rows:
+            sheet.append(ResultsExporter._row(questions, row))
+
+        excel_file = BytesIO()
+        wb.save(excel_file)
+        return excel_file.getvalue()
+
+    @staticmethod
+    def to_csv(questions: tuple[Question, ...], rows: Iterable[tuple]) -> bytes:
+        csv_file = StringIO()
+        writer = csv.writer(csv_file)
+        writer.writerow(ResultsExporter._header(questions))
+        for row in rows:
+            values = ResultsExporter._row(questions, row)
+            if isinstance(values[4], datetime):
+                values[4] = values[4].strftime('%Y-%m-%d %H:%M:%S')
+            writer.writerow(values)
+        return csv_file.getvalue().encode('utf-8-sig')
@@ -7,7 +7,7 @@ class StartFilter(UpdateFilter):
         self._session = bot_session
 
     def filter(self, update):
-        return not self._session.is_user_authorized(update.effective_chat.id)
+        return not self._session.peek_user_profile(update.effective_user.id).authorized
 
 
 class RealNameFilter(MessageFilter):
@@ -16,7 +16,8 @@ class RealNameFilter(MessageFilter):
         self._session = bot_session
 
     def filter(self, message):
-        return self._session.is_user_have_real_name(message.from_user.id)
+        profile = self._session.peek_user_profile(message.from_user.id)
+        return profile.authorized and profile.real_name is None
 
 
 class AdminFilter(MessageFilter):
@@ -25,7 +26,7 @@ class AdminFilter(MessageFilter):
         self._session = bot_session
     
     def filter(self, message):
-        return self._session.is_user_admin(message.from_user.id)
+        return self._session.peek_user_profile(message.from_user.id).admin
 
 
 class QuizCreationFilter(MessageFilter):
@@ -34,4 +35,4 @@ class QuizCreationFilter(MessageFilter):
         self._session = bot_session
 
     def filter(self, message):
-        return self._session.get_admins_busyness(message.from_user.id)
+        return self._session.peek_user_profile(message.from_user.id).busy
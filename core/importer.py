@@ -0,0 +1,187 @@
+import csv
+import json
+from io import BytesIO, TextIOWrapper
+from typing import Iterable, Iterator
+from zipfile import BadZipFile
+from openpyxl import load_workbook
+
+
+class QuizImporter:
+    formats = ('xlsx', 'csv', 'json')
+    max_errors = 20
+    max_name_length = 40
+    max_wording_length = 4096
+    max_option_length = 100
+
+    @staticmethod
+    def parse(file_name: str, content: bytes) -> list[dict]:
+        file_format = file_name.rsplit('.', 1)[-1].lower() if '.' in file_name else ''
+        collector = _QuizCollector(QuizImporter.max_errors, QuizImporter.max_name_length,
+                                   QuizImporter.max_wording_length, QuizImporter.max_option_length)
+        try:
+            if file_format == 'xlsx':
+                QuizImporter._collect_table(collector, QuizImporter._xlsx_rows(content))
+            elif file_format == 'csv':
+                QuizImporter._collect_table(collector, QuizImporter._csv_rows(content))
+            elif file_format == 'json':
+                QuizImporter._collect_json(collector, content)
+            else:
+                raise QuizImportError('Поддерживаются только файлы ' + ', '.join(QuizImporter.formats))
+        except (ValueError, KeyError, OSError, BadZipFile) as err:
+            raise QuizImportError(f'Не удалось прочитать файл: {err}')
+        return collector.finish()
+
+    @staticmethod
+    def _xlsx_rows(content: bytes) -> Iterator[tuple[str, tuple]]:
+        wb = load_workbook(BytesIO(content), read_only=True, data_only=True)
+        try:
+            for sheet in wb.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                next(rows, None)
+                for i, row in enumerate(rows, 2):
+                    yield f'Лист "{sheet.title}", строка {i}', row
+        finally:
+            wb.close()
+
+    @staticmethod
+    def _csv_rows(content: bytes) -> Iterator[tuple[str, tuple]]:
+        text = TextIOWrapper(BytesIO(content), encoding='utf-8-sig', newline='')
+        try:
+            dialect = csv.Sniffer().sniff(text.read(4096), delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        text.seek(0)
+        rows = csv.reader(text, dialect)
+        next(rows, None)
+        for i, row in enumerate(rows, 2):
+            yield f'Строка {i}', tuple(row)
+
+    @staticmethod
+    def _collect_table(collector: '_QuizCollector', rows: Iterable[tuple[str, tuple]]) -> None:
+        name = None
+        for location, row in rows:
+            cells = [_text(x) for x in row]
+            if not any(cells):
+                continue
+            cells += [''] * (3 - len(cells))
+            name = cells[0] or name
+            collector.add_question(location, name, cells[1], cells[2], [x for x in cells[3:] if x])
+
+    @staticmethod
+    def _collect_json(collector: '_QuizCollector', content: bytes) -> None:
+        data = json.loads(content.decode('utf-8-sig'))
+        quizzes = data if isinstance(data, list) else [data]
+        for i, quiz in enumerate(quizzes, 1):
+            if not isinstance(quiz, dict) or not isinstance(quiz.get('questions'), list):
+                collector.error(f'Квиз {i}', 'ожидается объект с полями "name" и "questions"')
+                continue
+            name = _text(quiz.get('name'))
+            collector.start_quiz(f'Квиз {i}', name)
+            for j, question in enumerate(quiz['questions'], 1):
+                location = f'Квиз {i}, вопрос {j}'
+                if not isinstance(question, dict):
+                    collector.error(location, 'ожидается объект с полями "question", "options" и "answer"')
+                    continue
+                options = question.get('options')
+                if not isinstance(options, list):
+                    options = []
+                collector.add_question(location, name, _text(question.get('question')),
+                                       question.get('answer'), [_text(x) for x in options if _text(x)])
+
+
+class _QuizCollector:
+    __slots__ = ('_quizzes', '_errors', '_error_count', '_max_errors', '_max_name_length',
+                 '_max_wording_length', '_max_option_length')
+
+    def __init__(self,
+                 max_errors: int,
+                 max_name_length: int,
+                 max_wording_length: int,
+                 max_option_length: int) -> None:
+        self._quizzes = {}
+        self._errors = []
+        self._error_count = 0
+        self._max_errors = max_errors
+        self._max_name_length = max_name_length
+        self._max_wording_length = max_wording_length
+        self._max_option_length = max_option_length
+
+    def error(self, location: str, message: str) -> None:
+        self._error_count += 1
+        if len(self._errors) < self._max_errors:
+            self._errors.append(f'{location}: {message}')
+
+    def start_quiz(self, location: str, name: str | None) -> None:
+        if name in self._quizzes:
+            self.error(location, f'квиз "{name}" уже встречался в файле')
+
+    def add_question(self,
+                     location: str,
+                     name: str | None,
+                     wording: str,
+                     answer: object,
+                     options: list[str]) -> None:
+        if not name:
+            self.error(location, 'не указано название квиза')
+            return
+        if len(name) > self._max_name_length:
+            self.error(location, f'название квиза длиннее {self._max_name_length} символов')
+            return
+        if not wording:
+            self.error(location, 'пустая формулировка вопроса')
+        elif _text_length(wording) > self._max_wording_length:
+            self.error(location, f'формулировка вопроса длиннее {self._max_wording_length} символов')
+        if len(options) < 2:
+            self.error(location, 'нужно хотя бы два варианта ответа')
+        for i, option in enumerate(options, 1):
+            if _text_length(option) > self._max_option_length:
+                self.error(location, f'вариант ответа {i} длиннее {self._max_option_length} символов')
+        right_answer = _number(answer)
+        if right_answer is None:
+            self.error(location, 'правильный ответ должен быть целым числом')
+        elif options and not 0 < right_answer <= len(options):
+            self.error(location, f'правильный ответ должен быть от 1 до {len(options)}')
+        if self._error_count:
+            return
+
+        quiz = self._quizzes.setdefault(name, {'name': name, 'questions': [], 'right_answers': []})
+        quiz['questions'].append((wording, options))
+        quiz['right_answers'].append(right_answer)
+
+    def finish(self) -> list[dict]:
+        if self._error_count:
+            errors = self._errors
+            if self._error_count > len(errors):
+                errors = errors + [f'...и еще {self._error_count - len(errors)}']
+            raise QuizImportError('Ошибки в файле:\n' + '\n'.join(errors))
+        if not self._quizzes:
+            raise QuizImportError('В файле нет ни одного вопроса')
+        return list(self._quizzes.values())
+
+
+def _text(value: object) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _text_length(value: str) -> int:
+    return len(value.encode('utf-16-le')) // 2
+
+
+def _number(value: object) -> int | None:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
+
+
+class QuizImportError(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
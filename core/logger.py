@@ -1,31 +1,214 @@
-from typing import Literal, Union
+import atexit
+import json
+from typing import Literal
 from datetime import datetime
-from os import path, mkdir
+from os import path, mkdir, replace, remove
+from queue import Queue, Empty
+from threading import Thread, Lock
 
 
 class Logger:
+    log_types = ('info', 'error', 'slow', 'trace')
+    max_file_size = 5 * 1024 * 1024
+    backup_count = 3
+    batch_size = 512
+    read_block_size = 8192
+    max_scan_size = 1024 * 1024
+
+    _queue = Queue()
+    _writer = None
+    _writer_lock = Lock()
+    _file_lock = Lock()
+
     @staticmethod
     def log(
         message: str,
-        log_type: Union[Literal['error'], Literal['info']]
+        log_type: Literal['error', 'info', 'slow', 'trace'],
+        user_id: int | None = None,
+        quiz_id: str | None = None,
+        details: dict | None = None
     ):
-        file_name = f'logs/{log_type}_logs.txt'
-        print(message if log_type=='info' else 'New message in error logs')
-        with open(file_name, 'a+') as file:
-            file.write(f'|{datetime.now().strftime("%Y-%m-%d %H:%M:%S")}| ~ {message}\n')
-    
+        Logger._ensure_writer()
+        record = {
+            'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'level': log_type,
+            'message': str(message),
+            'user_id': user_id,
+            'quiz_id': quiz_id
+        }
+        if details:
+            record['details'] = details
+        Logger._queue.put(record)
+
+    @staticmethod
+    def _ensure_writer():
+        if Logger._writer is not None:
+            return
+        with Logger._writer_lock:
+            if Logger._writer is None:
+                Logger._writer = Thread(target=Logger._write_loop, name='logger', daemon=True)
+                Logger._writer.start()
+
+    @staticmethod
+    def _write_loop():
+        stop = False
+        while not stop:
+            batch = [Logger._queue.get()]
+            try:
+                while len(batch) < Logger.batch_size:
+                    batch.append(Logger._queue.get_nowait())
+            except Empty:
+                pass
+            if None in batch:
+                stop = True
+                batch = [x for x in batch if x is not None]
+            Logger._write_batch(batch)
+
     @staticmethod
-    def clear_logs(log_type: Union[Literal['error'], Literal['info']] = None):
+    def _write_batch(batch: list[dict]):
+        lines = {}
+        for record in batch:
+            lines.setdefault(record['level'], []).append(
+                json.dumps(record, ensure_ascii=False, default=str) + '\n'
+            )
+            if record['level'] == 'info':
+                print(record['message'])
+        for log_type in lines:
+            if log_type != 'info':
+                print(f'New message in {log_type} logs')
+
+        with Logger._file_lock:
+            for log_type, log_lines in lines.items():
+                file_name = Logger.get_file_name(log_type)
+                try:
+                    with open(file_name, 'a+', encoding='utf-8') as file:
+                        file.writelines(log_lines)
+                    if path.getsize(file_name) >= Logger.max_file_size:
+                        Logger._rotate(file_name)
+                except OSError as err:
+                    print(f'Failed to write {file_name}: {err}')
+
+    @staticmethod
+    def _rotate(file_name: str):
+        oldest = f'{file_name}.{Logger.backup_count}'
+        if path.exists(oldest):
+            remove(oldest)
+        for i in range(Logger.backup_count - 1, 0, -1):
+            if path.exists(f'{file_name}.{i}'):
+                replace(f'{file_name}.{i}', f'{file_name}.{i+1}')
+        replace(file_name, f'{file_name}.1')
+
+    @staticmethod
+    def shutdown():
+        with Logger._writer_lock:
+            writer = Logger._writer
+            if writer is None:
+                return
+            Logger._queue.put(None)
+            writer.join()
+            Logger._writer = None
+
+    @staticmethod
+    def get_file_name(log_type: str) -> str:
+        return f'logs/{log_type}_logs.txt'
+
+    @staticmethod
+    def format_line(line: str) -> str:
+        try:
+            record = json.loads(line)
+            return f'|{record["time"]}| ~ {record["message"]}'
+        except (ValueError, TypeError, KeyError):
+            return line.rstrip('\n')
+
+    @staticmethod
+    def _matches(line: bytes, user_id: int | None) -> bool:
+        if not line.strip():
+            return False
+        if user_id is None:
+            return True
+        try:
+            return json.loads(line).get('user_id') == user_id
+        except (ValueError, AttributeError):
+            return False
+
+    @staticmethod
+    def read_page(log_type: str,
+                  offset: int | None = None,
+                  newer: bool = False,
+                  limit: int = 20,
+                  max_chars: int = 3500,
+                  user_id: int | None = None) -> tuple[list[str], int, int, int]:
+        with open(Logger.get_file_name(log_type), 'rb') as f:
+            size = f.seek(0, 2)
+            if newer:
+                lines, start, end = Logger._read_forward(f, min(offset or 0, size), limit, max_chars, user_id)
+            else:
+                end = size if offset is None else min(offset, size)
+                lines, start = Logger._read_backward(f, end, limit, max_chars, user_id)
+        return lines, start, end, size
+
+    @staticmethod
+    def _read_forward(f, start: int, limit: int, max_chars: int, user_id: int | None):
+        lines, chars = [], 0
+        f.seek(start)
+        end = start
+        while len(lines) < limit and end - start < Logger.max_scan_size:
+            line = f.readline()
+            if not line:
+                break
+            if Logger._matches(line, user_id):
+                text = Logger.format_line(line.decode('utf-8', 'replace'))
+                if lines and chars + len(text) > max_chars:
+                    break
+                lines.append(text)
+                chars += len(text) + 1
+            end += len(line)
+        return lines, start, end
+
+    @staticmethod
+    def _read_backward(f, end: int, limit: int, max_chars: int, user_id: int | None):
+        lines, chars = [], 0
+        pos = tail = start = end
+        buffer = b''
+        while len(lines) < limit and end - pos < Logger.max_scan_size:
+            if pos == 0:
+                parts, buffer = [buffer], b''
+            else:
+                read_size = min(Logger.read_block_size, pos)
+                pos -= read_size
+                f.seek(pos)
+                parts = (f.read(read_size) + buffer).split(b'\n')
+                buffer = parts.pop(0)
+            for part in reversed(parts):
+                line_start = tail - len(part)
+                if Logger._matches(part, user_id):
+                    text = Logger.format_line(part.decode('utf-8', 'replace'))
+                    if lines and chars + len(text) > max_chars:
+                        return lines[::-1], start
+                    lines.append(text)
+                    chars += len(text) + 1
+                start = line_start
+                tail = line_start - 1
+                if len(lines) >= limit:
+                    return lines[::-1], start
+            if pos == 0 and not buffer:
+                break
+        return lines[::-1], start
+
+    @staticmethod
+    def clear_logs(log_type: Literal['error', 'info', 'slow', 'trace'] | None = None):
         if log_type is None:
-            open('logs/info_logs.txt', 'w').close()
-            Logger.log('Logs cleared', 'info')
-            open('logs/error_logs.txt', 'w').close()
-            Logger.log('Logs cleared', 'error')
+            for x in Logger.log_types:
+                Logger.clear_logs(x)
         else:
-            open(f'logs/{log_type}_logs.txt', 'w').close()
+            with Logger._file_lock:
+                open(Logger.get_file_name(log_type), 'w').close()
             Logger.log('Logs cleared', log_type)
-    
+
     @staticmethod
     def check_logs_dir_existence():
         if not path.exists('logs/'):
-            mkdir('logs')
\ No newline at end of file
+            mkdir('logs')
+
+
+atexit.register(Logger.shutdown)
@@ -0,0 +1,182 @@
+import asyncio
+from bisect import bisect_left
+from time import monotonic, perf_counter
+from functools import wraps
+from typing import Callable
+from core.utils import singleton
+from core.logger import Logger
+
+
+class Histogram:
+    buckets = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        rank, seen = q * self.count, 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[i] if i < len(self.buckets) else float('inf')
+        return 0.0
+
+
+class RateMeter:
+    __slots__ = ('_window', '_counts', '_stamps')
+
+    def __init__(self, window: int = 60) -> None:
+        self._window = window
+        self._counts = [0] * window
+        self._stamps = [0] * window
+
+    def mark(self) -> None:
+        second = int(monotonic())
+        i = second % self._window
+        if self._stamps[i] != second:
+            self._stamps[i] = second
+            self._counts[i] = 0
+        self._counts[i] += 1
+
+    def rate(self) -> float:
+        since = int(monotonic()) - self._window
+        return sum(c for c, s in zip(self._counts, self._stamps) if s > since) / self._window
+
+
+@singleton
+class Metrics:
+    __slots__ = ('_counters', '_histograms', '_gauges', '_rates', '_started_at', '_server')
+
+    def __init__(self) -> None:
+        self._counters = {}
+        self._histograms = {}
+        self._gauges = {}
+        self._rates = {}
+        self._started_at = monotonic()
+        self._server = None
+
+    @staticmethod
+    def _key(name: str, labels: dict[str, str] | None) -> tuple:
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def inc(self, name: str, labels: dict[str, str] | None = None, value: float = 1) -> None:
+        key = self._key(name, labels)
+        self._counters[key] = self._counters.get(key, 0) + value
+        rate = self._rates.get(name)
+        if rate is not None:
+            rate.mark()
+
+    def track_rate(self, name: str) -> None:
+        self._rates.setdefault(name, RateMeter())
+
+    def rate(self, name: str) -> float:
+        rate = self._rates.get(name)
+        return 0.0 if rate is None else rate.rate()
+
+    def observe(self, name: str, value: float, labels: dict[str, str] | None = None) -> None:
+        key = self._key(name, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def gauge(self, name: str, func: Callable[[], float], labels: dict[str, str] | None = None) -> None:
+        self._gauges[self._key(name, labels)] = func
+
+    def instrument_handler(self, callback: Callable) -> Callable:
+        labels = {'handler': callback.__name__.lstrip('_')}
+
+        @wraps(callback)
+        async def wrapper(*args, **kwargs):
+            started = perf_counter()
+            try:
+                return await callback(*args, **kwargs)
+            except Exception:
+                self.inc('handler_errors_total', labels)
+                raise
+            finally:
+                self.observe('handler_duration_seconds', perf_counter() - started, labels)
+        return wrapper
+
+    def counter_value(self, name: str, labels: dict[str, str] | None = None) -> float:
+        return self._counters.get(self._key(name, labels), 0)
+
+    def histograms(self, name: str) -> dict[str, Histogram]:
+        return {
+            ','.join(v for _, v in labels): histogram
+            for (n, labels), histogram in self._histograms.items() if n == name
+        }
+
+    def gauge_value(self, name: str, labels: dict[str, str] | None = None) -> float:
+        func = self._gauges.get(self._key(name, labels))
+        return 0.0 if func is None else func()
+
+    @property
+    def uptime(self) -> float:
+        return monotonic() - self._started_at
+
+    @staticmethod
+    def _format(name: str, labels: tuple, extra: tuple = ()) -> str:
+        labels = labels + extra
+        if not labels:
+            return name
+        return name + '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+    def render(self) -> str:
+        lines = []
+        for (name, labels), value in sorted(self._counters.items()):
+            lines.append(f'{self._format(name, labels)} {value}')
+        for (name, labels), func in sorted(self._gauges.items(), key=lambda x: x[0]):
+            try:
+                lines.append(f'{self._format(name, labels)} {func()}')
+            except Exception as err:
+                Logger.log(f'Failed to read gauge {name}: {err}', 'error')
+        for (name, labels), histogram in sorted(self._histograms.items(), key=lambda x: x[0]):
+            cumulative = 0
+            for bound, count in zip(Histogram.buckets + ('+Inf',), histogram.counts):
+                cumulative += count
+                lines.append(f'{self._format(name + "_bucket", labels, (("le", bound),))} {cumulative}')
+            lines.append(f'{self._format(name + "_sum", labels)} {histogram.sum}')
+            lines.append(f'{self._format(name + "_count", labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.split()
+            if len(parts) > 1 and parts[0] == b'GET' and parts[1] == b'/metrics':
+                status, body = '200 OK', self.render().encode()
+            else:
+                status, body = '404 Not Found', b''
+            writer.write(
+                f'HTTP/1.1 {status}\r\n'
+                'Content-Type: text/plain; version=0.0.4\r\n'
+                f'Content-Length: {len(body)}\r\n'
+                'Connection: close\r\n\r\n'.encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_server(self, host: str, port: int) -> None:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        Logger.log(f'Metrics endpoint started on {host}:{port}', 'info')
+
+    async def stop_server(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
@@ -0,0 +1,38 @@
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    username VARCHAR(40) NOT NULL,
+    name VARCHAR(40) NOT NULL,
+    real_name VARCHAR(127)
+);
+
+CREATE SEQUENCE IF NOT EXISTS quiz_version_seq;
+
+CREATE TABLE IF NOT EXISTS quizzes (
+    quiz_id UUID PRIMARY KEY,
+    name VARCHAR(40) NOT NULL UNIQUE,
+    right_answers INTEGER[] NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT FALSE,
+    qa_pairs JSON NOT NULL,
+    version BIGINT NOT NULL DEFAULT nextval('quiz_version_seq')
+);
+
+ALTER TABLE quizzes
+ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT nextval('quiz_version_seq');
+
+CREATE TABLE IF NOT EXISTS admins (
+    user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
+    is_busy BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS results (
+    user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
+    quiz_id UUID REFERENCES quizzes(quiz_id) ON DELETE CASCADE,
+    result VARCHAR(10) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS quiz_sessions (
+    user_id INTEGER PRIMARY KEY,
+    quiz_id UUID NOT NULL,
+    answers INTEGER[] NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,31 @@
+DELETE FROM results
+WHERE user_id IS NULL OR quiz_id IS NULL;
+
+DELETE FROM results r
+USING results d
+WHERE
+    r.user_id = d.user_id
+    AND r.quiz_id = d.quiz_id
+    AND r.ctid > d.ctid;
+
+ALTER TABLE results
+    ALTER COLUMN user_id SET NOT NULL,
+    ALTER COLUMN quiz_id SET NOT NULL,
+    ADD CONSTRAINT results_pkey PRIMARY KEY (user_id, quiz_id);
+
+CREATE INDEX IF NOT EXISTS results_quiz_id_idx ON results (quiz_id);
+
+DELETE FROM admins
+WHERE user_id IS NULL;
+
+DELETE FROM admins a
+USING admins d
+WHERE
+    a.user_id = d.user_id
+    AND a.ctid > d.ctid;
+
+ALTER TABLE admins
+    ALTER COLUMN user_id SET NOT NULL,
+    ADD CONSTRAINT admins_pkey PRIMARY KEY (user_id);
+
+CREATE INDEX IF NOT EXISTS quiz_sessions_updated_at_idx ON quiz_sessions (updated_at);
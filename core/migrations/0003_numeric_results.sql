@@ -0,0 +1,21 @@
+ALTER TABLE results
+    ADD COLUMN correct INTEGER,
+    ADD COLUMN total INTEGER,
+    ADD COLUMN answers INTEGER[],
+    ADD COLUMN submitted_at TIMESTAMPTZ;
+
+UPDATE results
+SET
+    correct = CAST(split_part(result, '/', 1) AS INTEGER),
+    total = CAST(split_part(result, '/', 2) AS INTEGER);
+
+ALTER TABLE results
+    ALTER COLUMN correct SET NOT NULL,
+    ALTER COLUMN total SET NOT NULL,
+    ALTER COLUMN submitted_at SET DEFAULT now(),
+    DROP COLUMN result;
+
+CREATE INDEX IF NOT EXISTS results_quiz_id_correct_idx
+ON results (quiz_id, correct DESC, submitted_at);
+
+DROP INDEX IF EXISTS results_quiz_id_idx;
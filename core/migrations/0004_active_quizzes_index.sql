@@ -0,0 +1,3 @@
+CREATE INDEX IF NOT EXISTS quizzes_active_name_idx
+ON quizzes (name)
+WHERE is_active;
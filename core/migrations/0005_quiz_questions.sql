@@ -0,0 +1,34 @@
+CREATE TABLE IF NOT EXISTS quiz_questions (
+    quiz_id UUID NOT NULL REFERENCES quizzes(quiz_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    wording TEXT NOT NULL,
+    PRIMARY KEY (quiz_id, position)
+);
+
+CREATE TABLE IF NOT EXISTS quiz_options (
+    quiz_id UUID NOT NULL,
+    position INTEGER NOT NULL,
+    option_index INTEGER NOT NULL,
+    wording TEXT NOT NULL,
+    PRIMARY KEY (quiz_id, position, option_index),
+    FOREIGN KEY (quiz_id, position)
+        REFERENCES quiz_questions(quiz_id, position) ON DELETE CASCADE
+);
+
+INSERT INTO quiz_questions (quiz_id, position, wording)
+SELECT q.quiz_id, p.ordinality - 1, e.key
+FROM
+    quizzes q,
+    json_array_elements(q.qa_pairs) WITH ORDINALITY p(pair, ordinality),
+    json_each(p.pair) e;
+
+INSERT INTO quiz_options (quiz_id, position, option_index, wording)
+SELECT q.quiz_id, p.ordinality - 1, o.ordinality, o.wording
+FROM
+    quizzes q,
+    json_array_elements(q.qa_pairs) WITH ORDINALITY p(pair, ordinality),
+    json_each(p.pair) e,
+    json_array_elements_text(e.value) WITH ORDINALITY o(wording, ordinality);
+
+ALTER TABLE quizzes
+    DROP COLUMN qa_pairs;
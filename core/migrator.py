@@ -0,0 +1,67 @@
+import re
+from os import path, listdir
+from core.logger import Logger
+
+
+MIGRATIONS_DIR = path.join(path.dirname(__file__), 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+MIGRATION_LOCK_ID = 0x71756978
+
+
+class Migrator:
+    __slots__ = ('_connection', '_migrations_dir')
+
+    def __init__(self, connection, migrations_dir: str = MIGRATIONS_DIR) -> None:
+        self._connection = connection
+        self._migrations_dir = migrations_dir
+
+    def _load_migrations(self) -> list[tuple[int, str, str]]:
+        migrations = []
+        for file_name in listdir(self._migrations_dir):
+            match = MIGRATION_FILE_PATTERN.match(file_name)
+            if match is None:
+                continue
+            with open(path.join(self._migrations_dir, file_name), 'r') as f:
+                migrations.append((int(match[1]), match[2], f.read()))
+        return sorted(migrations)
+
+    def apply(self) -> int:
+        applied = 0
+        with self._connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s);', (MIGRATION_LOCK_ID,))
+            try:
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INTEGER PRIMARY KEY,
+                        name VARCHAR(127) NOT NULL,
+                        applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                    );
+                    """
+                )
+                self._connection.commit()
+                cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_version;')
+                current_version = cursor.fetchone()[0]
+
+                for version, name, query in self._load_migrations():
+                    if version <= current_version:
+                        continue
+                    try:
+                        cursor.execute(query)
+                        cursor.execute(
+                            """
+                            INSERT INTO schema_version (version, name)
+                            VALUES (%s, %s);
+                            """, (version, name)
+                        )
+                        self._connection.commit()
+                    except Exception as err:
+                        self._connection.rollback()
+                        Logger.log(f'Migration {version:04d}_{name} failed: {err}', 'error')
+                        raise
+                    Logger.log(f'Applied migration: {version:04d}_{name}', 'info')
+                    applied += 1
+            finally:
+                cursor.execute('SELECT pg_advisory_unlock(%s);', (MIGRATION_LOCK_ID,))
+                self._connection.commit()
+        return applied
@@ -0,0 +1,58 @@
+from typing import NamedTuple
+
+
+class UserProfile(NamedTuple):
+    authorized: bool
+    admin: bool
+    busy: bool
+    real_name: str | None
+
+
+class Question(NamedTuple):
+    wording: str
+    options: tuple[str, ...]
+
+
+class Quiz(NamedTuple):
+    quiz_id: str
+    name: str
+    right_answers: tuple[int, ...]
+    is_active: bool
+    version: int
+
+    @classmethod
+    def from_row(cls,
+                 quiz_id: str,
+                 name: str,
+                 right_answers: list[int],
+                 is_active: bool,
+                 version: int) -> 'Quiz':
+        return cls(quiz_id, name, tuple(right_answers), is_active, version)
+
+    @property
+    def question_count(self) -> int:
+        return len(self.right_answers)
+
+    def score(self, answers: list[int]) -> int:
+        return sum(u == r for u, r in zip(answers, self.right_answers))
+
+
+class Page(NamedTuple):
+    rows: tuple[tuple, ...]
+    total: int
+    has_previous: bool
+    has_next: bool
+
+    @classmethod
+    def from_rows(cls,
+                  rows: list[tuple],
+                  limit: int,
+                  cursor: object | None,
+                  backward: bool) -> 'Page':
+        total = rows[0][-1] if rows else 0
+        more = len(rows) > limit
+        rows = [row[:-1] for row in rows[:limit]]
+        if backward:
+            rows.reverse()
+            return cls(tuple(rows), total, more, True)
+        return cls(tuple(rows), total, cursor is not None, more)
@@ -1,63 +1,205 @@
+import re
+from bisect import bisect_right
+
+
 class QuizBuilder:
+    max_errors = 20
+    max_name_length = 40
+    default_options = ('1', '2', '3', '4')
+
     @staticmethod
     def create_quiz_from_message(message: str) -> dict:
-        message_lines = message.strip().split('\n')
-        if len(message_lines) < 3:
-            raise QuizCreationError('Неправильные число параметров')
-        
-        name = message_lines[0].strip()
-        questions_number = None
-        try:
-            questions_number = int(message_lines[1].strip())
-        except ValueError:
-            raise QuizCreationError('Количество вопросов должно быть представлено в виде целого числа')
-        right_answers = []
-        try:
-            right_answers = list(map(int, message_lines[2].strip().split(' ')))
-        except ValueError:
-            raise QuizCreationError('Правильные ответы должны быть представлены как целые числа')
-        if len(right_answers) != questions_number:
-            raise QuizCreationError('Неправильное число правильных ответов')
-
-        wordings_section_begin_index = message.find('$')
-        if wordings_section_begin_index != -1:
-            wordings_section_end_index = message.find('$', wordings_section_begin_index + 1)
-            if wordings_section_end_index == -1:
-                raise QuizCreationError('Ошибка в секции формулировок вопросов(нет закрывающего "$")')
-            wordings_section = message[wordings_section_begin_index+1:wordings_section_end_index]
-            wordings = wordings_section.split(';')
-            if len(wordings) != questions_number:
-                raise QuizCreationError('Ошибка в секции формулировок вопросов(неправильное число формулировок)')
-            questions = [x.strip() for x in wordings]
-        else:
-            questions = [f'Вопрос №{i+1}' for i in range(questions_number)]
-        
-        answer_options_section_begin_index = message.find('~')
-        if answer_options_section_begin_index != -1:
-            answers = []
-            answer_options_section_end_index = message.find('~', answer_options_section_begin_index+1)
-            if answer_options_section_end_index == -1:
-                raise QuizCreationError('Ошибка в секции формулировок вариантов ответов(нет закрывающего "~")')
-            answer_options_section = message[answer_options_section_begin_index+1:answer_options_section_end_index]
-            answer_options = answer_options_section.split(';')
-            if len(answer_options) != questions_number:
-                raise QuizCreationError('Ошибка в секции формулировок вариантов ответов(неправильное количество вопросов)')
-            for i, answer in enumerate(answer_options):
-                options = [x.strip() for x in answer.split(':')]
-                if len(options) != 4:
-                    raise QuizCreationError(f'Ошибка в секции формулировок вариантов ответов(неправильное число формулировок для вопроса {i+1};ожидается - 4)')
-                answers.append(options)
-        else:
-            answers = [['1', '2', '3', '4'] for _ in range(questions_number)]
-        
-        qa_pairs = [{q:a} for q,a in zip(questions, answers)]
+        return _QuizParser(message).parse()
+
+
+class _QuizParser:
+    __slots__ = ('_text', '_newlines', '_errors', '_header', '_wordings', '_options')
+    delimiters = re.compile(r'[\n$~;:]')
+    words = re.compile(r'\S+')
+    section_names = {
+        '$': 'формулировок вопросов',
+        '~': 'вариантов ответов'
+    }
 
+    def __init__(self, text: str) -> None:
+        self._text = text
+        self._newlines = []
+        self._errors = []
+        self._header = []
+        self._wordings = None
+        self._options = None
+
+    def parse(self) -> dict:
+        self._scan()
+        name, questions_number, right_answers = self._parse_header()
+        questions = self._build_questions(questions_number if right_answers is not None else None)
+        if questions is not None:
+            for i, ((value, pos), (_, options)) in enumerate(zip(right_answers, questions)):
+                if not 0 < value <= len(options):
+                    self._error(pos, f'правильный ответ на вопрос {i+1} должен быть от 1 до {len(options)}')
+
+        if self._errors:
+            errors = [message for _, message in sorted(self._errors, key=lambda x: x[0])]
+            if len(errors) > QuizBuilder.max_errors:
+                errors = errors[:QuizBuilder.max_errors] + [f'...и еще {len(errors) - QuizBuilder.max_errors}']
+            raise QuizCreationError('Ошибки в сообщении:\n' + '\n'.join(errors))
         return {
             'name': name,
-            'qa_pairs': qa_pairs,
-            'right_answers': right_answers
+            'questions': questions,
+            'right_answers': [value for value, _ in right_answers]
         }
-        
+
+    def _error(self, pos: int, message: str) -> None:
+        line = bisect_right(self._newlines, pos - 1)
+        column = pos - (self._newlines[line - 1] + 1 if line else 0)
+        self._errors.append((pos, f'Строка {line + 1}, столбец {column + 1}: {message}'))
+
+    def _token(self, start: int, end: int) -> tuple[str, int]:
+        value = self._text[start:end]
+        stripped = value.lstrip()
+        return stripped.rstrip(), start + len(value) - len(stripped)
+
+    def _check_gap(self, start: int, end: int) -> None:
+        value, pos = self._token(start, end)
+        if value:
+            self._error(pos, 'текст вне секций формулировок и вариантов ответов')
+
+    def _scan(self) -> None:
+        text = self._text
+        header = self._header
+        newlines = self._newlines
+        token = self._token
+        section = None
+        section_pos = start = 0
+        items = question = None
+
+        while start < len(text) and text[start].isspace():
+            if text[start] == '\n':
+                newlines.append(start)
+            start += 1
+
+        for match in self.delimiters.finditer(text, start):
+            char, pos = match.group(), match.start()
+            if char == '\n':
+                newlines.append(pos)
+
+            if section is None:
+                if len(header) < 3:
+                    if char == '\n':
+                        header.append(token(start, pos))
+                        start = pos + 1
+                elif char == '$' or char == '~':
+                    self._check_gap(start, pos)
+                    section, section_pos, start = char, pos, pos + 1
+                    items, question = [], []
+            elif char == ';':
+                if section == '~':
+                    question.append(token(start, pos))
+                    items.append((question, question[0][1]))
+                    question = []
+                else:
+                    items.append(token(start, pos))
+                start = pos + 1
+            elif char == ':' and section == '~':
+                question.append(token(start, pos))
+                start = pos + 1
+            elif char == section:
+                last = token(start, pos)
+                if section == '~':
+                    question.append(last)
+                    if last[0] or len(question) > 1 or not items:
+                        items.append((question, question[0][1]))
+                elif last[0] or not items:
+                    items.append(last)
+                self._close_section(section, section_pos, items)
+                section, start = None, pos + 1
+
+        if section is not None:
+            self._error(section_pos, f'нет закрывающего "{section}" в секции {self.section_names[section]}')
+        elif len(header) < 3:
+            if text[start:].strip():
+                header.append(token(start, len(text)))
+        else:
+            self._check_gap(start, len(text))
+
+    def _close_section(self, section: str, pos: int, items: list) -> None:
+        if (self._wordings if section == '$' else self._options) is not None:
+            self._error(pos, f'секция {self.section_names[section]} указана повторно')
+        elif section == '$':
+            self._wordings = (items, pos)
+        else:
+            self._options = (items, pos)
+
+    def _parse_header(self) -> tuple[str, int | None, list[tuple[int, int]] | None]:
+        complete = len(self._header) == 3
+        if not complete:
+            self._error(len(self._text), 'ожидаются название квиза, количество вопросов '
+                                         'и номера правильных ответов на отдельных строках')
+            self._header += [('', len(self._text))] * (3 - len(self._header))
+        (name, name_pos), (count, count_pos), (answers, answers_pos) = self._header
+
+        if not name:
+            self._error(name_pos, 'пустое название квиза')
+        elif len(name) > QuizBuilder.max_name_length:
+            self._error(name_pos, f'название квиза длиннее {QuizBuilder.max_name_length} символов')
+
+        questions_number = int(count) if count.isdecimal() and len(count) <= 9 else 0
+        if questions_number <= 0:
+            self._error(count_pos, 'количество вопросов должно быть целым положительным числом')
+            questions_number = None
+
+        right_answers = []
+        for match in self.words.finditer(answers):
+            if not match.group().isdecimal():
+                self._error(answers_pos + match.start(),
+                            f'правильный ответ "{match.group()}" должен быть целым числом')
+                right_answers = None
+            elif right_answers is not None:
+                value = match.group()
+                right_answers.append((int(value) if len(value) <= 9 else 0, answers_pos + match.start()))
+        if not complete or questions_number is None:
+            right_answers = None
+        elif right_answers is not None and len(right_answers) != questions_number:
+            self._error(answers_pos, f'указано правильных ответов: {len(right_answers)}, '
+                                     f'ожидается {questions_number}')
+            right_answers = None
+        return name, questions_number, right_answers
+
+    def _build_questions(self, questions_number: int | None) -> list[tuple[str, list[str]]] | None:
+        wordings = options = None
+        if self._wordings is not None:
+            items, pos = self._wordings
+            if questions_number is not None and len(items) != questions_number:
+                self._error(pos, f'в секции формулировок вопросов {len(items)} формулировок, '
+                                 f'ожидается {questions_number}')
+            wordings = []
+            for i, (value, item_pos) in enumerate(items):
+                if not value:
+                    self._error(item_pos, f'пустая формулировка вопроса {i+1}')
+                wordings.append(value)
+        elif questions_number is not None:
+            wordings = [f'Вопрос №{i+1}' for i in range(questions_number)]
+
+        if self._options is not None:
+            items, pos = self._options
+            if questions_number is not None and len(items) != questions_number:
+                self._error(pos, f'в секции вариантов ответов {len(items)} вопросов, '
+                                 f'ожидается {questions_number}')
+            options = []
+            for i, (question, question_pos) in enumerate(items):
+                if len(question) < 2:
+                    self._error(question_pos, f'для вопроса {i+1} нужно хотя бы два варианта ответа')
+                for value, item_pos in question:
+                    if not value:
+                        self._error(item_pos, f'пустой вариант ответа в вопросе {i+1}')
+                options.append([value for value, _ in question])
+        elif questions_number is not None:
+            options = [list(QuizBuilder.default_options) for _ in range(questions_number)]
+
+        if questions_number is None or len(wordings) != questions_number or len(options) != questions_number:
+            return None
+        return list(zip(wordings, options))
+
 
 class QuizCreationError(Exception):
     def __init__(self, message: str) -> None:
@@ -0,0 +1,148 @@
+import asyncio
+from time import monotonic, perf_counter
+from typing import Any, Callable, Coroutine
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+from core.logger import Logger
+from core.metrics import Metrics
+
+
+class TokenBucket:
+    __slots__ = ('_rate', '_capacity', '_tokens', '_updated')
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = monotonic()
+
+    def reserve(self) -> float:
+        now = monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self._rate
+
+    def is_idle(self) -> bool:
+        return self._tokens + (monotonic() - self._updated) * self._rate >= self._capacity
+
+
+class OutgoingRateLimiter(BaseRateLimiter):
+    coalesced_endpoints = ('editMessageText', 'editMessageReplyMarkup')
+    max_chat_buckets = 10000
+
+    __slots__ = ('_global', '_chats', '_chat_rate', '_chat_burst', '_group_rate',
+                 '_max_retries', '_resume_at', '_latest_edits',
+                 '_waiting', '_in_flight', '_dropped', '_retries')
+
+    def __init__(self,
+                 global_rate: float = 30.0,
+                 chat_rate: float = 1.0,
+                 chat_burst: float = 5.0,
+                 group_rate: float = 20 / 60,
+                 max_retries: int = 3) -> None:
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats = {}
+        self._chat_rate = chat_rate
+        self._chat_burst = chat_burst
+        self._group_rate = group_rate
+        self._max_retries = max_retries
+        self._resume_at = 0.0
+        self._latest_edits = {}
+        self._waiting = 0
+        self._in_flight = 0
+        self._dropped = 0
+        self._retries = 0
+        metrics = Metrics()
+        metrics.gauge('bot_api_requests_queued', lambda: self._waiting - self._in_flight)
+        metrics.gauge('bot_api_requests_in_flight', lambda: self._in_flight)
+        metrics.gauge('bot_api_edits_dropped_total', lambda: self._dropped)
+        metrics.gauge('bot_api_retries_total', lambda: self._retries)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_bucket(self, chat_id: int | str) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= self.max_chat_buckets:
+                self._chats = {k: v for k, v in self._chats.items() if not v.is_idle()}
+            if isinstance(chat_id, str) or chat_id < 0:
+                bucket = TokenBucket(self._group_rate, self._group_rate * 60)
+            else:
+                bucket = TokenBucket(self._chat_rate, self._chat_burst)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def _wait_turn(self, chat_id: int | str | None) -> None:
+        delay = self._global.reserve()
+        if chat_id is not None:
+            delay = max(delay, self._chat_bucket(chat_id).reserve())
+        delay = max(delay, self._resume_at - monotonic())
+        while delay > 0:
+            await asyncio.sleep(delay)
+            delay = self._resume_at - monotonic()
+
+    async def process_request(self,
+                              callback: Callable[..., Coroutine[Any, Any, Any]],
+                              args: Any,
+                              kwargs: dict[str, Any],
+                              endpoint: str,
+                              data: dict[str, Any],
+                              rate_limit_args: int | None) -> Any:
+        chat_id = data.get('chat_id')
+        if isinstance(chat_id, str) and chat_id.lstrip('-').isdigit():
+            chat_id = int(chat_id)
+
+        edit_key = None
+        if endpoint in self.coalesced_endpoints and 'message_id' in data:
+            edit_key = (chat_id, data['message_id'])
+            ticket = object()
+            self._latest_edits[edit_key] = ticket
+
+        max_retries = self._max_retries if rate_limit_args is None else rate_limit_args
+        metrics = Metrics()
+        labels = {'method': endpoint}
+        self._waiting += 1
+        try:
+            for attempt in range(max_retries + 1):
+                started = perf_counter()
+                await self._wait_turn(chat_id)
+                if edit_key is not None and self._latest_edits.get(edit_key) is not ticket:
+                    self._dropped += 1
+                    return True
+                sent = perf_counter()
+                metrics.observe('bot_api_queue_seconds', sent - started)
+                self._in_flight += 1
+                try:
+                    return await callback(*args, **kwargs)
+                except RetryAfter as err:
+                    if attempt == max_retries:
+                        Logger.log(f'Bot API rate limit hit after {max_retries} retries ({endpoint})', 'error')
+                        metrics.inc('bot_api_errors_total', labels)
+                        raise
+                    self._retries += 1
+                    delay = float(err.retry_after) * (attempt + 1)
+                    self._resume_at = max(self._resume_at, monotonic() + delay)
+                    Logger.log(f'Bot API rate limit hit, retrying {endpoint} in {delay:.1f}s', 'info')
+                except Exception:
+                    metrics.inc('bot_api_errors_total', labels)
+                    raise
+                finally:
+                    self._in_flight -= 1
+                    metrics.observe('bot_api_duration_seconds', perf_counter() - sent, labels)
+        finally:
+            self._waiting -= 1
+            if edit_key is not None and self._latest_edits.get(edit_key) is ticket:
+                del self._latest_edits[edit_key]
+
+    def stats(self) -> dict[str, int]:
+        return {
+            'queued': self._waiting - self._in_flight,
+            'in_flight': self._in_flight,
+            'dropped_edits': self._dropped,
+            'retries': self._retries
+        }
@@ -0,0 +1,170 @@
+from typing import Callable
+from telegram import InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.helpers import escape_markdown
+from core.callbacks import CallbackCodec
+from core.models import Quiz, Question, Page
+
+
+class QuizRenderer:
+    __slots__ = ('_questions', '_descriptions', '_menus', '_menus_generation')
+    description_page_limit = 3500
+    description_item_limit = 1000
+
+    def __init__(self) -> None:
+        self._questions = {}
+        self._descriptions = {}
+        self._menus = {}
+        self._menus_generation = None
+
+    def question(self,
+                 quiz: Quiz,
+                 index: int,
+                 question: Question) -> tuple[str, InlineKeyboardMarkup]:
+        cached = self._questions.get(quiz.quiz_id)
+        if cached is None or cached[0] != quiz.version:
+            cached = self._questions[quiz.quiz_id] = (quiz.version, {})
+        rendered = cached[1].get(index)
+        if rendered is None:
+            rendered = cached[1][index] = self._render_question(quiz.quiz_id, index, question)
+        return rendered
+
+    @staticmethod
+    def _render_question(quiz_id: str,
+                         index: int,
+                         question: Question) -> tuple[str, InlineKeyboardMarkup]:
+        if index == 0:
+            last = InlineKeyboardButton('❌ Отмена', callback_data=CallbackCodec.encode('cancel', 'user_quiz'))
+        else:
+            last = InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'quiz'))
+        return (
+            question.wording,
+            InlineKeyboardMarkup(
+                [[InlineKeyboardButton(
+                    x, callback_data=CallbackCodec.encode('answer', quiz_id, i+1)
+                )] for i, x in enumerate(question.options)] +\
+                [[last]]
+            )
+        )
+
+    def description(self,
+                    quiz: Quiz,
+                    questions: tuple[Question, ...],
+                    page: int = 0) -> tuple[str, InlineKeyboardMarkup]:
+        cached = self._descriptions.get(quiz.quiz_id)
+        if cached is None or cached[0] != quiz.version:
+            cached = self._descriptions[quiz.quiz_id] = (quiz.version, self._render_description(quiz, questions))
+        pages = cached[1]
+        return pages[min(max(page, 0), len(pages) - 1)]
+
+    @staticmethod
+    def _text_length(text: str) -> int:
+        return len(text.encode('utf-16-le')) // 2
+
+    @staticmethod
+    def _render_description(quiz: Quiz,
+                            questions: tuple[Question, ...]) -> list[tuple[str, InlineKeyboardMarkup]]:
+        header = f'*Название*: {escape_markdown(quiz.name)}\n*Статус*: ' +\
+                 ('🟩 (активен)' if quiz.is_active else '🟥 (неактивен)') +\
+                 f'\n*Вопросов*: {len(questions)}\n\n'
+        chunks, parts, size = [], [], 0
+        for i, ((question, answers), y) in enumerate(zip(questions, quiz.right_answers)):
+            item = f'{i+1}. {question}\nВарианты ответов:\n•' + '\n•'.join(answers)
+            if len(item) > QuizRenderer.description_item_limit:
+                item = item[:QuizRenderer.description_item_limit - 1] + '…'
+            item = escape_markdown(item + f'\n(Правильный ответ - {y})\n')
+            length = QuizRenderer._text_length(item)
+            if parts and size + length > QuizRenderer.description_page_limit:
+                chunks.append(parts)
+                parts, size = [], 0
+            parts.append(item)
+            size += length
+        chunks.append(parts)
+
+        pages = []
+        for n, parts in enumerate(chunks):
+            title = f'*Вопросы* ({n+1}/{len(chunks)}):\n' if len(chunks) > 1 else '*Вопросы*:\n'
+            pages.append((header + title + ''.join(parts),
+                          QuizRenderer._description_keyboard(quiz.quiz_id, n, len(chunks))))
+        return pages
+
+    @staticmethod
+    def _description_keyboard(quiz_id: str, page: int, pages: int) -> InlineKeyboardMarkup:
+        row = []
+        if page > 0:
+            row.append(InlineKeyboardButton('⬅️', callback_data=CallbackCodec.encode('manage', quiz_id, page - 1)))
+        if page < pages - 1:
+            row.append(InlineKeyboardButton('➡️', callback_data=CallbackCodec.encode('manage', quiz_id, page + 1)))
+        return InlineKeyboardMarkup(
+            ([row] if row else []) +
+            [
+                [InlineKeyboardButton('🔄 Сменить статус', callback_data=CallbackCodec.encode('toggle', quiz_id))],
+                [InlineKeyboardButton('📋 Получить результаты', callback_data=CallbackCodec.encode('results', quiz_id))],
+                [InlineKeyboardButton('🗑️ Удалить', callback_data=CallbackCodec.encode('request_deletion', quiz_id))],
+                [InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'quizzes_to_manage')),
+                 InlineKeyboardButton('🏠 Домой', callback_data=CallbackCodec.encode('return', 'menu'))],
+            ]
+        )
+
+    def _menu(self,
+              key: object,
+              generation: int | None,
+              data: object,
+              builder: Callable[[object], object]) -> object:
+        if generation is None:
+            return builder(data)
+        if generation != self._menus_generation:
+            self._menus.clear()
+            self._menus_generation = generation
+        if key not in self._menus:
+            self._menus[key] = builder(data)
+        return self._menus[key]
+
+    def forget(self, quiz_id: str) -> None:
+        self._questions.pop(quiz_id, None)
+        self._descriptions.pop(quiz_id, None)
+
+    @staticmethod
+    def quizzes_overview(total: int, active: int) -> str:
+        if not total:
+            return 'Нет созданных квизов'
+        return f'Всего квизов: {total}\nАктивных: {active}'
+
+    @staticmethod
+    def paging(action: str, page: Page) -> list[list[InlineKeyboardButton]]:
+        row = []
+        if page.has_previous:
+            row.append(InlineKeyboardButton('⬅️', callback_data=CallbackCodec.encode(action, page.rows[0][0], 'p')))
+        if page.has_next:
+            row.append(InlineKeyboardButton('➡️', callback_data=CallbackCodec.encode(action, page.rows[-1][0], 'n')))
+        return [row] if row else []
+
+    def quizzes_to_manage(self,
+                          generation: int | None,
+                          page: Page) -> InlineKeyboardMarkup | None:
+        return self._menu(('manage', page), generation, page, self._render_quizzes_to_manage)
+
+    @staticmethod
+    def _render_quizzes_to_manage(page: Page) -> InlineKeyboardMarkup | None:
+        if not page.rows:
+            return None
+        return InlineKeyboardMarkup(
+            [[InlineKeyboardButton(
+                name, callback_data=CallbackCodec.encode('manage', id)
+            )] for id, name, _  in page.rows
+            ] +
+            QuizRenderer.paging('manage_page', page) +
+            [[InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'quizzes_menu')),
+             InlineKeyboardButton('🏠 Домой', callback_data=CallbackCodec.encode('return', 'menu'))]]
+        )
+
+    @staticmethod
+    def quizzes_to_pass(page: Page) -> InlineKeyboardMarkup | None:
+        if not page.rows:
+            return None
+        return InlineKeyboardMarkup(
+            [[InlineKeyboardButton(
+                name, callback_data=CallbackCodec.encode('choose', id)
+            )] for id, name, _ in page.rows] +
+            QuizRenderer.paging('pass_page', page) +
+            [[InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'menu'))]]
+        )
@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime, timezone
+from time import time
+from core.db import DBTool
+from core.logger import Logger
+
+
+class QuizSession:
+    __slots__ = ('quiz_id', 'answers', 'updated_at')
+
+    def __init__(self,
+                 quiz_id: str,
+                 answers: list[int] | None = None,
+                 updated_at: float | None = None) -> None:
+        self.quiz_id = quiz_id
+        self.answers = [] if answers is None else answers
+        self.updated_at = time() if updated_at is None else updated_at
+
+    @property
+    def index(self) -> int:
+        return len(self.answers)
+
+
+class SessionStore:
+    __slots__ = ()
+
+    async def get(self, user_id: int) -> QuizSession | None:
+        raise NotImplementedError
+
+    async def save(self, user_id: int, session: QuizSession) -> None:
+        raise NotImplementedError
+
+    async def delete(self, user_id: int) -> None:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    __slots__ = ('_sessions', '_ttl', '_sweeper')
+
+    def __init__(self, ttl: float = 10800.0) -> None:
+        self._sessions = {}
+        self._ttl = ttl
+        self._sweeper = None
+
+    async def get(self, user_id: int) -> QuizSession | None:
+        session = self._sessions.get(user_id)
+        if session is not None and session.updated_at + self._ttl < time():
+            del self._sessions[user_id]
+            return None
+        return session
+
+    async def save(self, user_id: int, session: QuizSession) -> None:
+        session.updated_at = time()
+        self._sessions[user_id] = session
+
+    async def delete(self, user_id: int) -> None:
+        self._sessions.pop(user_id, None)
+
+    def expire(self) -> int:
+        deadline = time() - self._ttl
+        expired = [k for k, v in self._sessions.items() if v.updated_at < deadline]
+        for user_id in expired:
+            del self._sessions[user_id]
+        return len(expired)
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(min(self._ttl, 60.0))
+            expired = self.expire()
+            if expired:
+                Logger.log(f'Expired quiz sessions: {expired}', 'info')
+
+    async def start(self) -> None:
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class PostgresSessionStore(SessionStore):
+    __slots__ = ('_db', '_local', '_dirty', '_flushing', '_ttl',
+                 '_flush_interval', '_batch_size', '_flusher', '_flush_lock')
+
+    def __init__(self,
+                 db: DBTool,
+                 ttl: float = 10800.0,
+                 flush_interval: float = 1.0,
+                 batch_size: int = 500) -> None:
+        self._db = db
+        self._local = MemorySessionStore(ttl)
+        self._dirty = {}
+        self._flushing = {}
+        self._ttl = ttl
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._flusher = None
+        self._flush_lock = asyncio.Lock()
+
+    async def get(self, user_id: int) -> QuizSession | None:
+        session = await self._local.get(user_id)
+        if session is None and user_id not in self._dirty and user_id not in self._flushing:
+            row = await self._db.load_quiz_session(user_id, self._ttl)
+            if row is not None:
+                session = QuizSession(row[0], list(row[1]), float(row[2]))
+                await self._local.save(user_id, session)
+        return session
+
+    async def save(self, user_id: int, session: QuizSession) -> None:
+        await self._local.save(user_id, session)
+        self._mark_dirty(user_id, session)
+
+    async def delete(self, user_id: int) -> None:
+        await self._local.delete(user_id)
+        self._mark_dirty(user_id, None)
+
+    def _mark_dirty(self, user_id: int, session: QuizSession | None) -> None:
+        self._dirty[user_id] = session
+        if len(self._dirty) >= self._batch_size:
+            asyncio.get_running_loop().create_task(self.flush())
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            dirty = self._flushing = self._dirty
+            self._dirty = {}
+            saved = [
+                (user_id, s.quiz_id, list(s.answers),
+                 datetime.fromtimestamp(s.updated_at, timezone.utc))
+                for user_id, s in dirty.items() if s is not None
+            ]
+            deleted = [user_id for user_id, s in dirty.items() if s is None]
+
+            if not await self._db.sync_quiz_sessions(saved, deleted):
+                for user_id, session in dirty.items():
+                    self._dirty.setdefault(user_id, session)
+            self._flushing = {}
+
+    async def _flush_periodically(self) -> None:
+        ticks = 0
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+                ticks += 1
+                if ticks * self._flush_interval >= min(self._ttl, 60.0):
+                    ticks = 0
+                    self._local.expire()
+                    await self._db.delete_expired_quiz_sessions(self._ttl)
+            except Exception as err:
+                Logger.log(f'Quiz sessions flush failed: {err}', 'error')
+
+    async def start(self) -> None:
+        self._flusher = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        if self._flusher is not None:
+            self._flusher.cancel()
+            self._flusher = None
+        await self.flush()
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+
+class QuizSessionExpiredError(Exception):
+    def __init__(self, message: str) -> None:
+        super().__init__(message)
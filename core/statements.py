@@ -0,0 +1,95 @@
+import re
+from threading import Lock
+from psycopg2.extensions import connection
+from core.logger import Logger
+
+
+class PreparedConnection(connection):
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+class Statement:
+    __slots__ = ('name', 'prepare', 'execute', 'confirmed')
+
+    def __init__(self, name: str, sql: str, params: int) -> None:
+        self.name = name
+        self.prepare = f'PREPARE {name} AS {sql};'
+        if params:
+            self.execute = f'EXECUTE {name} (' + ', '.join(['%s'] * params) + ');'
+        else:
+            self.execute = f'EXECUTE {name};'
+        self.confirmed = False
+
+
+class StatementRegistry:
+    __slots__ = ('_statements', '_lock')
+    placeholder = re.compile(r'%[s%]')
+
+    def __init__(self) -> None:
+        self._statements = {}
+        self._lock = Lock()
+
+    def get(self, name: str, query: str) -> Statement | None:
+        statement = self._statements.get(query, False)
+        if statement is False:
+            with self._lock:
+                statement = self._statements.get(query, False)
+                if statement is False:
+                    statement = self._compile(f'{name[:48]}_{len(self._statements)}', query)
+                    self._statements[query] = statement
+        return statement
+
+    def _compile(self, name: str, query: str) -> Statement:
+        params = 0
+
+        def replace(match: re.Match) -> str:
+            nonlocal params
+            if match.group() == '%%':
+                return '%'
+            params += 1
+            return f'${params}'
+
+        return Statement(name, self.placeholder.sub(replace, query.strip().rstrip(';')), params)
+
+    def prepare(self, connection, statement: Statement, in_transaction: bool = False) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                if in_transaction:
+                    cursor.execute('SAVEPOINT prepare_statement;')
+                    try:
+                        cursor.execute(statement.prepare)
+                    except Exception:
+                        cursor.execute('ROLLBACK TO SAVEPOINT prepare_statement;')
+                        raise
+                    finally:
+                        cursor.execute('RELEASE SAVEPOINT prepare_statement;')
+                else:
+                    cursor.execute(statement.prepare)
+        except Exception as err:
+            Logger.log(f'{statement.name}: prepare failed: {err}', 'error')
+            with self._lock:
+                for query, value in self._statements.items():
+                    if value is statement:
+                        self._statements[query] = None
+            return False
+        connection.prepared.add(statement.name)
+        statement.confirmed = True
+        return True
+
+    def prepare_all(self, connection) -> None:
+        missing = [x for x in list(self._statements.values())
+                   if x is not None and x.confirmed and x.name not in connection.prepared]
+        if not missing:
+            return
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('\n'.join(x.prepare for x in missing))
+        except Exception as err:
+            Logger.log(f'Failed to prepare statements on checkout: {err}', 'error')
+            return
+        connection.prepared.update(x.name for x in missing)
+
+    def __len__(self) -> int:
+        return sum(1 for x in self._statements.values() if x is not None)
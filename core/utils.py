@@ -1,4 +1,5 @@
 from telegram import InlineKeyboardMarkup, InlineKeyboardButton
+from core.callbacks import CallbackCodec
 
 
 def singleton(cls):
@@ -12,61 +13,45 @@ def singleton(cls):
 
 USER_START_MENU_KEYBOARD = InlineKeyboardMarkup(
                     [
-                        [InlineKeyboardButton('✍️ Редактировать ФИО', callback_data='edit_real_name')],
-                        [InlineKeyboardButton('🧩 Пройти квиз', callback_data='choose_quiz')]
+                        [InlineKeyboardButton('✍️ Редактировать ФИО', callback_data=CallbackCodec.encode('edit_real_name'))],
+                        [InlineKeyboardButton('🧩 Пройти квиз', callback_data=CallbackCodec.encode('choose_quiz'))]
                     ]
                 )
         
 ADMIN_START_MENU_KEYBOARD = InlineKeyboardMarkup(
                     [
-                        [InlineKeyboardButton('✍️ Редактировать ФИО', callback_data='edit_real_name')],
-                        [InlineKeyboardButton('🧩 Пройти квиз', callback_data='choose_quiz')],
-                        [InlineKeyboardButton('🛠 Меню квизов', callback_data='quizzes_menu')],
-                        [InlineKeyboardButton('⚙️ Панель администратора', callback_data='admin_panel')]
+                        [InlineKeyboardButton('✍️ Редактировать ФИО', callback_data=CallbackCodec.encode('edit_real_name'))],
+                        [InlineKeyboardButton('🧩 Пройти квиз', callback_data=CallbackCodec.encode('choose_quiz'))],
+                        [InlineKeyboardButton('🛠 Меню квизов', callback_data=CallbackCodec.encode('quizzes_menu'))],
+                        [InlineKeyboardButton('⚙️ Панель администратора', callback_data=CallbackCodec.encode('admin_panel'))]
                     ]
                 )
 
 QUIZZES_MENU_KEYBOARD = InlineKeyboardMarkup(
                     [
-                        [InlineKeyboardButton('🎛️ Управление квизами', callback_data='show_quizzes_to_manage')],
-                        [InlineKeyboardButton('🏗️ Создать квиз', callback_data='create_quiz')],
-                        [InlineKeyboardButton('↩️ Назад', callback_data='return:menu')]
+                        [InlineKeyboardButton('🎛️ Управление квизами', callback_data=CallbackCodec.encode('show_quizzes_to_manage'))],
+                        [InlineKeyboardButton('🏗️ Создать квиз', callback_data=CallbackCodec.encode('create_quiz'))],
+                        [InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'menu'))]
                     ]
                 )
 
 ADMIN_PANEL_KEYBOARD = InlineKeyboardMarkup(
     [
-        [InlineKeyboardButton('📝 Список пользователей', callback_data='users_list')],
-        [InlineKeyboardButton('ℹ️ Логи с информацией', callback_data='logs:info')],
-        [InlineKeyboardButton('⚠️ Логи с ошибками', callback_data='logs:error')],
-        [InlineKeyboardButton('↩️ Назад', callback_data='return:menu')]
+        [InlineKeyboardButton('📝 Список пользователей', callback_data=CallbackCodec.encode('users_list'))],
+        [InlineKeyboardButton('ℹ️ Логи с информацией', callback_data=CallbackCodec.encode('logs', 'info'))],
+        [InlineKeyboardButton('⚠️ Логи с ошибками', callback_data=CallbackCodec.encode('logs', 'error'))],
+        [InlineKeyboardButton('🐢 Медленные запросы', callback_data=CallbackCodec.encode('logs', 'slow'))],
+        [InlineKeyboardButton('📊 Метрики', callback_data=CallbackCodec.encode('metrics'))],
+        [InlineKeyboardButton('↩️ Назад', callback_data=CallbackCodec.encode('return', 'menu'))]
     ]
 )
 
-INIT_DB_QUERY = """
-    CREATE TABLE IF NOT EXISTS users (
-        user_id INTEGER PRIMARY KEY,
-        username VARCHAR(40) NOT NULL,
-        name VARCHAR(40) NOT NULL,
-        real_name VARCHAR(127)
-    );
+QUIZ_RESULTS_MESSAGE_LIMIT = 50
 
-    CREATE TABLE IF NOT EXISTS quizzes (
-        quiz_id UUID PRIMARY KEY,
-        name VARCHAR(40) NOT NULL UNIQUE,
-        right_answers INTEGER[] NOT NULL,
-        is_active BOOLEAN NOT NULL DEFAULT FALSE,
-        qa_pairs JSON NOT NULL
-    );
+LOGS_PAGE_SIZE = 20
 
-    CREATE TABLE IF NOT EXISTS admins (
-        user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
-        is_busy BOOLEAN NOT NULL DEFAULT FALSE
-    );
+USERS_PAGE_SIZE = 20
 
-    CREATE TABLE IF NOT EXISTS results (
-        user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
-        quiz_id UUID REFERENCES quizzes(quiz_id) ON DELETE CASCADE,
-        result VARCHAR(10) NOT NULL
-    );
-"""
\ No newline at end of file
+QUIZZES_PAGE_SIZE = 10
+
+IMPORT_MAX_FILE_SIZE = 20 * 1024 * 1024
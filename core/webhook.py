@@ -0,0 +1,86 @@
+from typing import NamedTuple
+from time import time
+import httpx
+
+
+class WebhookConfig(NamedTuple):
+    webhook_url: str
+    listen: str = '127.0.0.1'
+    port: int = 8443
+    url_path: str = ''
+    secret_token: str | None = None
+    max_connections: int = 40
+
+
+class UpdateFactory:
+    __slots__ = ('_update_id', '_message_id')
+
+    def __init__(self) -> None:
+        self._update_id = 0
+        self._message_id = 0
+
+    def _next_update_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    def _next_message_id(self) -> int:
+        self._message_id += 1
+        return self._message_id
+
+    @staticmethod
+    def _user(user_id: int) -> dict:
+        return {
+            'id': user_id,
+            'is_bot': False,
+            'first_name': f'user{user_id}',
+            'username': f'user{user_id}'
+        }
+
+    def make_message_update(self, user_id: int, text: str) -> dict:
+        message = {
+            'message_id': self._next_message_id(),
+            'date': int(time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': self._user(user_id),
+            'text': text
+        }
+        if text.startswith('/'):
+            message['entities'] = [
+                {'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}
+            ]
+        return {'update_id': self._next_update_id(), 'message': message}
+
+    def make_callback_update(self, user_id: int, message_id: int, data: str) -> dict:
+        return {
+            'update_id': self._next_update_id(),
+            'callback_query': {
+                'id': str(self._update_id),
+                'from': self._user(user_id),
+                'chat_instance': str(user_id),
+                'data': data,
+                'message': {
+                    'message_id': message_id,
+                    'date': int(time()),
+                    'chat': {'id': user_id, 'type': 'private'},
+                    'text': '-'
+                }
+            }
+        }
+
+
+class WebhookSender(UpdateFactory):
+    __slots__ = ('_url', '_headers', '_client')
+
+    def __init__(self, url: str, secret_token: str | None = None) -> None:
+        super().__init__()
+        self._url = url
+        self._headers = {} if secret_token is None else\
+                        {'X-Telegram-Bot-Api-Secret-Token': secret_token}
+        self._client = httpx.AsyncClient()
+
+    async def send(self, update: dict) -> int:
+        response = await self._client.post(self._url, json=update, headers=self._headers)
+        return response.status_code
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -1,6 +1,7 @@
 #Скрипт для генерации .env файла.
 from re import search
 from os import path
+from secrets import token_hex
 
 
 def main():
@@ -48,6 +49,27 @@ def main():
             f'DB_HOST="{host}"\n'+\
             f'DB_PORT="{port}"\n'+\
             f'DB_NAME="{db_name}"\n'+\
+            f'DB_POOL_MIN_SIZE="1"\n'+\
+            f'DB_POOL_MAX_SIZE="10"\n'+\
+            f'DB_POOL_TIMEOUT="5"\n'+\
+            f'DB_TRACE="0"\n'+\
+            f'DB_SLOW_QUERY_MS="200"\n'+\
+            f'DB_EXPLAIN_SAMPLE_RATE="0"\n'+\
+            f'DB_PREPARE="1"\n'+\
+            f'USER_CACHE_TTL="60"\n'+\
+            f'USER_CACHE_SIZE="10000"\n'+\
+            f'QUIZ_CACHE_REVALIDATE="5"\n'+\
+            f'SESSION_STORE="memory"\n'+\
+            f'SESSION_TTL="10800"\n'+\
+            f'SESSION_FLUSH_INTERVAL="1"\n'+\
+            f'BOT_API_GLOBAL_RATE="30"\n'+\
+            f'BOT_API_CHAT_RATE="1"\n'+\
+            f'BOT_API_CHAT_BURST="5"\n'+\
+            f'BOT_API_GROUP_RATE="20"\n'+\
+            f'BOT_API_MAX_RETRIES="3"\n'+\
+            f'METRICS_HOST="127.0.0.1"\n'+\
+            f'METRICS_PORT="9464"\n'+\
+            f'WEBHOOK_SECRET_TOKEN="{token_hex(32)}"\n'+\
             f'ADMIN_KEY="{admin_key}"\n'
         )
     print('Конфигурационный файл успешно сгенерирован.')
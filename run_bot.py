@@ -4,24 +4,74 @@ from dotenv import dotenv_values
 from core.bot import QuizBot
 from core.base_api import API
 from core.db import DBTool
+from core.sessions import MemorySessionStore, PostgresSessionStore
 from core.logger import Logger
+from core.webhook import WebhookConfig
+from core.rate_limiter import OutgoingRateLimiter
 
 
-def main(config: dict) -> None:
+def main(config: dict, args: argparse.Namespace) -> None:
     try:
         db = DBTool(
                 config['DB_USERNAME'],
                 config['DB_PASSWORD'],
                 config['DB_HOST'],
                 config['DB_PORT'],
-                config['DB_NAME'])
+                config['DB_NAME'],
+                int(config.get('DB_POOL_MIN_SIZE', 1)),
+                int(config.get('DB_POOL_MAX_SIZE', 10)),
+                float(config.get('DB_POOL_TIMEOUT', 5)),
+                trace_queries=config.get('DB_TRACE', '0') == '1',
+                slow_query_threshold=float(config.get('DB_SLOW_QUERY_MS', 200)) / 1000,
+                explain_sample_rate=float(config.get('DB_EXPLAIN_SAMPLE_RATE', 0)),
+                prepare_statements=config.get('DB_PREPARE', '1') == '1')
     except Exception:
         print('Ошибка при подключении к БД. Проверьте файл error_logs.txt.')
 
-    api = API(db)
-    bot = QuizBot(config['TOKEN'], api, config['ADMIN_KEY'])
+    session_ttl = float(config.get('SESSION_TTL', 10800))
+    if config.get('SESSION_STORE', 'memory') == 'postgres':
+        session_store = PostgresSessionStore(
+            db,
+            session_ttl,
+            float(config.get('SESSION_FLUSH_INTERVAL', 1))
+        )
+    else:
+        session_store = MemorySessionStore(session_ttl)
 
-    bot.run()
+    api = API(
+        db,
+        float(config.get('USER_CACHE_TTL', 60)),
+        int(config.get('USER_CACHE_SIZE', 10000)),
+        float(config.get('QUIZ_CACHE_REVALIDATE', 5)),
+        session_store
+    )
+    bot = QuizBot(
+        config['TOKEN'],
+        api,
+        config['ADMIN_KEY'],
+        args.concurrent_updates,
+        OutgoingRateLimiter(
+            float(config.get('BOT_API_GLOBAL_RATE', 30)),
+            float(config.get('BOT_API_CHAT_RATE', 1)),
+            float(config.get('BOT_API_CHAT_BURST', 5)),
+            float(config.get('BOT_API_GROUP_RATE', 20)) / 60,
+            int(config.get('BOT_API_MAX_RETRIES', 3))
+        ),
+        metrics_address=(config.get('METRICS_HOST') or '127.0.0.1', int(config['METRICS_PORT']))\
+                        if config.get('METRICS_PORT') else None
+    )
+
+    webhook = None
+    if args.webhook_url:
+        webhook = WebhookConfig(
+            args.webhook_url,
+            args.listen,
+            args.port,
+            args.url_path,
+            args.secret_token or config.get('WEBHOOK_SECRET_TOKEN') or None,
+            args.max_connections
+        )
+    bot.run(webhook)
     db.close_connection()
 
 
@@ -34,6 +84,45 @@ if __name__ == '__main__':
         action='store_true',
         help='Очищает файлы с логами перед запуском'
     )
+    arg_parser.add_argument(
+        '--webhook-url',
+        help='Публичный URL, на который Telegram будет отправлять обновления. '+\
+             'Если не указан, бот работает через long polling'
+    )
+    arg_parser.add_argument(
+        '--listen',
+        default='127.0.0.1',
+        help='Адрес, на котором слушает локальный HTTP сервер (по умолчанию 127.0.0.1)'
+    )
+    arg_parser.add_argument(
+        '--port',
+        type=int,
+        default=8443,
+        help='Порт локального HTTP сервера (по умолчанию 8443)'
+    )
+    arg_parser.add_argument(
+        '--url-path',
+        default='',
+        help='Путь, по которому сервер принимает обновления'
+    )
+    arg_parser.add_argument(
+        '--secret-token',
+        help='Секретный токен, который Telegram передает в заголовке запроса '+\
+             '(по умолчанию WEBHOOK_SECRET_TOKEN из .env)'
+    )
+    arg_parser.add_argument(
+        '--max-connections',
+        type=int,
+        default=40,
+        help='Максимальное число одновременных соединений от Telegram (по умолчанию 40)'
+    )
+    arg_parser.add_argument(
+        '--concurrent-updates',
+        type=int,
+        default=32,
+        help='Число обновлений, обрабатываемых одновременно; '+\
+             'обновления одного пользователя всегда обрабатываются по порядку (по умолчанию 32)'
+    )
 
     Logger.check_logs_dir_existence()
     args = arg_parser.parse_args()
@@ -42,6 +131,6 @@ if __name__ == '__main__':
 
     if path.exists('.env'):
         config = dotenv_values('.env')
-        main(config)
+        main(config, args)
     else:
         print('Нет файла с переменными окружения. Запустите скрипт gen_dot_env.py для его генерации.')